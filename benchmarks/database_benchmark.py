@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.migrations import migrate, SCHEMA_VERSION
+
+ROWS = 1_000_000
+BATCH = 50_000
+
+QUERIES = {
+    "get_recent_images": ("SELECT path FROM images ORDER BY last_used_at DESC LIMIT 10", False),
+    "get_recent_memes": ("SELECT path FROM meme_outputs ORDER BY created_at DESC, id DESC LIMIT 10", False),
+    "статистика мема": ('''SELECT m.id, m.top_text, s.views, s.downloads FROM memes m
+                           LEFT JOIN statistics s ON m.id = s.meme_id WHERE m.id = ?''', True),
+    "increment_views": ('''UPDATE statistics SET views = views + 1,
+                           last_viewed = CURRENT_TIMESTAMP WHERE meme_id = ?''', True),
+}
+
+
+def fill(conn, rows):
+    cursor = conn.cursor()
+    start = 1_600_000_000
+    for offset in range(0, rows, BATCH):
+        ids = range(offset + 1, min(rows, offset + BATCH) + 1)
+        stamps = [time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(start + i * 37)) for i in ids]
+        cursor.executemany('''INSERT INTO images (id, path, width, height, content_hash, file_size, mtime_ns,
+                              created_at, last_used_at) VALUES (?, ?, 800, 600, ?, 120000, ?, ?, ?)''',
+                           ((i, f"images/{i}.jpg", f"{i:032x}", (start + i * 37) * 10 ** 9, stamp, stamp)
+                            for i, stamp in zip(ids, stamps)))
+        cursor.executemany('''INSERT INTO memes (id, image_id, top_text, bottom_text, font_size, text_color,
+                              outline_color, has_outline, has_shadow, output_path, font, filter, created_at)
+                              VALUES (?, ?, 'Верх', 'Низ', 48, '#ffffff', '#000000', 1, 0, ?, 'Impact', 'Нет', ?)''',
+                           ((i, i, f"memes/{i}.png", stamp) for i, stamp in zip(ids, stamps)))
+        cursor.executemany("INSERT INTO meme_outputs (meme_id, path, format, created_at) VALUES (?, ?, 'png', ?)",
+                           ((i, f"memes/{i}.png", stamp) for i, stamp in zip(ids, stamps)))
+        cursor.executemany("INSERT INTO statistics (meme_id, views, downloads, likes) VALUES (?, 0, 0, 0)",
+                           ((i,) for i in ids))
+    conn.commit()
+
+
+def drop_indexes(conn):
+    # Индексы схемы (в том числе idx_images_last_used_at) удаляются, их SQL сохраняется для create_indexes
+    indexes = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL").fetchall()
+    for name, _ in indexes:
+        conn.execute(f"DROP INDEX {name}")
+    conn.commit()
+    return [sql for _, sql in indexes]
+
+
+def create_indexes(conn, indexes):
+    for sql in indexes:
+        conn.execute(sql)
+    conn.commit()
+
+
+def measure(conn, query, with_id, rows, repeats=20):
+    rng = random.Random(1)
+    best = None
+    for _ in range(repeats):
+        params = (rng.randint(1, rows),) if with_id else ()
+        start = time.perf_counter()
+        conn.execute(query, params).fetchall()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    conn.rollback()
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+
+    with tempfile.TemporaryDirectory() as directory:
+        conn = sqlite3.connect(os.path.join(directory, "memes.db"))
+        migrate(conn.cursor())
+        conn.commit()
+        indexes = drop_indexes(conn)
+
+        print(f"Заполнение: {rows} строк (схема версии {SCHEMA_VERSION})...")
+        fill(conn, rows)
+
+        before = {name: measure(conn, query, with_id, rows) for name, (query, with_id) in QUERIES.items()}
+
+        start = time.perf_counter()
+        create_indexes(conn, indexes)
+        print(f"Создание индексов ({len(indexes)}): {time.perf_counter() - start:.2f} с")
+
+        after = {name: measure(conn, query, with_id, rows) for name, (query, with_id) in QUERIES.items()}
+        conn.close()
+
+    print(f"{'Запрос':>20} {'До, мс':>10} {'После, мс':>10} {'Ускорение':>10}")
+    for name in QUERIES:
+        print(f"{name:>20} {before[name] * 1000:>10.2f} {after[name] * 1000:>10.3f} "
+              f"{before[name] / after[name]:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtGui import QGuiApplication, QImage, QColor, QPainter, QLinearGradient
+from src.constants import EXPORT_PROFILES
+from src.export_engine import ExportEngine
+
+SIZE = (4000, 3000)
+RUNS = 3
+
+
+def make_meme(size):
+    image = QImage(size[0], size[1], QImage.Format.Format_ARGB32_Premultiplied)
+    gradient = QLinearGradient(0, 0, size[0], size[1])
+    gradient.setColorAt(0, QColor(30, 60, 120))
+    gradient.setColorAt(1, QColor(220, 180, 90))
+    painter = QPainter(image)
+    painter.fillRect(image.rect(), gradient)
+    painter.end()
+    return image
+
+
+def best_of(func):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    app = QGuiApplication([sys.argv[0]])
+    image = make_meme(SIZE)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        base = os.path.join(directory, "meme.png")
+        for name, outputs in EXPORT_PROFILES.items():
+            print(f"Профиль «{name}», {SIZE[0]}x{SIZE[1]}, ядер: {os.cpu_count()}")
+            singles = []
+            for fmt, max_dimension, quality in outputs:
+                options = {'quality': quality} if quality is not None else None
+                path = ExportEngine.output_path(base, fmt, max_dimension)
+                elapsed = best_of(lambda: ExportEngine.save_output(image, path, fmt, max_dimension, options))
+                singles.append(elapsed)
+                print(f"  {fmt:>5} {str(max_dimension or 'оригинал'):>9}: {elapsed:.3f} с")
+            
+            parallel = best_of(lambda: ExportEngine.save_profile(image, base, outputs))
+            print(f"  по очереди (сумма):    {sum(singles):.3f} с")
+            print(f"  самый медленный выход: {max(singles):.3f} с")
+            print(f"  save_profile:          {parallel:.3f} с")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import resource
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtGui import QGuiApplication, QImage, QColor, QPainter, QLinearGradient
+
+SIZES = {
+    "12 MP": (4000, 3000),
+    "48 MP": (8000, 6000),
+}
+PREVIEW = QSize(1920, 1080)
+
+
+def make_photo(path, size):
+    image = QImage(size[0], size[1], QImage.Format.Format_RGB32)
+    gradient = QLinearGradient(0, 0, size[0], size[1])
+    gradient.setColorAt(0, QColor(30, 60, 120))
+    gradient.setColorAt(1, QColor(220, 180, 90))
+    painter = QPainter(image)
+    painter.fillRect(image.rect(), gradient)
+    painter.end()
+    image.save(path, quality=90)
+
+
+def legacy_preview(path):
+    from PyQt6.QtGui import QPixmap
+    image = QPixmap(path).toImage()
+    return image.scaled(PREVIEW, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+
+def scaled_preview(path):
+    from src.image_processor import SourceImage
+    return SourceImage(path).preview(PREVIEW)
+
+
+def run_one(mode, path):
+    app = QGuiApplication([sys.argv[0]])
+    func = legacy_preview if mode == "legacy" else scaled_preview
+    start = time.perf_counter()
+    preview = func(path)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed:.4f} {peak:.1f} {preview.width()}x{preview.height()}")
+
+
+def run_script(*args):
+    # ru_maxrss наследуется через fork/exec, поэтому и файлы, и замеры - в отдельных процессах
+    return subprocess.run([sys.executable, __file__] + list(args),
+                          capture_output=True, text=True, check=True).stdout.split()
+
+
+def measure(mode, path):
+    output = run_script("--run", mode, path)
+    return float(output[0]), float(output[1]), output[2]
+
+
+def main():
+    if "--run" in sys.argv:
+        index = sys.argv.index("--run")
+        run_one(sys.argv[index + 1], sys.argv[index + 2])
+        return
+    if "--make" in sys.argv:
+        index = sys.argv.index("--make")
+        app = QGuiApplication([sys.argv[0]])
+        make_photo(sys.argv[index + 1], (int(sys.argv[index + 2]), int(sys.argv[index + 3])))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'Размер':>8} {'Вариант':>10} {'Превью, с':>10} {'Пик RSS, МБ':>12} {'Превью':>10}")
+        for label, size in SIZES.items():
+            path = os.path.join(directory, f"photo_{size[0]}x{size[1]}.jpg")
+            run_script("--make", path, str(size[0]), str(size[1]))
+            for mode in ("legacy", "scaled"):
+                elapsed, peak, preview = measure(mode, path)
+                print(f"{label:>8} {mode:>10} {elapsed:>10.3f} {peak:>12.1f} {preview:>10}")
+
+
+if __name__ == '__main__':
+    main()
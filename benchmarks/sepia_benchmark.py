@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.filter_manager import FilterManager
+
+SIZES = {
+    "1 MP": (1152, 864),
+    "4 MP": (2304, 1728),
+    "12 MP": (4000, 3000),
+}
+
+
+def legacy_sepia(img):
+    img = img.convert("RGB")
+    width, height = img.size
+    pixels = img.load()
+
+    for y in range(height):
+        for x in range(width):
+            r, g, b = pixels[x, y]
+            tr = min(255, int(0.393 * r + 0.769 * g + 0.189 * b))
+            tg = min(255, int(0.349 * r + 0.686 * g + 0.168 * b))
+            tb = min(255, int(0.272 * r + 0.534 * g + 0.131 * b))
+            pixels[x, y] = (tr, tg, tb)
+
+    return img
+
+
+def measure(func, img, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(img)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    skip_legacy = "--skip-legacy" in sys.argv
+
+    print(f"{'Размер':>8} {'Цикл, с':>10} {'Матрица, с':>12} {'Ускорение':>10}")
+    for label, size in SIZES.items():
+        img = Image.effect_noise(size, 64).convert("RGB")
+
+        fast = measure(FilterManager._apply_sepia, img, 5)
+        if skip_legacy:
+            print(f"{label:>8} {'-':>10} {fast:>12.4f} {'-':>10}")
+            continue
+
+        slow = measure(legacy_sepia, img, 1)
+        print(f"{label:>8} {slow:>10.3f} {fast:>12.4f} {slow / fast:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
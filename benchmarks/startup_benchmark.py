@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import json
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODULES = [
+    "src",
+    "src.constants",
+    "src.database",
+    "src.filter_pipeline",
+    "src.image_bridge",
+    "src.meme_renderer",
+    "src.cli",
+    "src.batch_processor",
+    "src.text_style_dialog",
+    "src.statistics_dialog",
+    "src.main_window",
+]
+HEAVY = ("PIL.Image", "PyQt6.QtWidgets")
+RUNS = 5
+
+# То, что раньше загружал src/__init__.py при любом импорте пакета
+EAGER_IMPORTS = ["PIL.Image", "PIL.ImageFilter", "src.image_bridge", "src.statistics_dialog", "src.text_style_dialog"]
+
+
+def import_cost(module):
+    # Каждый модуль - в чистом интерпретаторе, иначе его зависимости уже окажутся в sys.modules
+    code = (f"import sys, json; import {module}; "
+            f"print(json.dumps([name in sys.modules for name in {list(HEAVY)!r}]))")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative = int(parts[1])
+    return cumulative / 1000, json.loads(result.stdout)
+
+
+def run_paint(mode):
+    start = time.perf_counter()
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    if mode == "eager":
+        import importlib
+        for name in EAGER_IMPORTS:
+            importlib.import_module(name)
+    from PyQt6.QtCore import QObject, QEvent, QTimer
+    from PyQt6.QtWidgets import QApplication
+    from src.main_window import MemeGeneratorPro
+    imported = time.perf_counter()
+    
+    app = QApplication([sys.argv[0]])
+    painted = {}
+    
+    class PaintWatcher(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and "paint" not in painted:
+                painted["paint"] = time.perf_counter()
+                QTimer.singleShot(0, app.quit)
+            return False
+    
+    watcher = PaintWatcher()
+    app.installEventFilter(watcher)
+    window = MemeGeneratorPro()
+    constructed = time.perf_counter()
+    app.exec()
+    window.close()
+    
+    print(f"{imported - start:.4f} {constructed - start:.4f} {painted['paint'] - start:.4f}")
+
+
+def measure_paint(mode):
+    samples = []
+    for _ in range(RUNS):
+        # Пустой рабочий каталог: своя база и никакого "последнего изображения"
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, PYTHONPATH=ROOT)
+            result = subprocess.run([sys.executable, os.path.abspath(__file__), "--paint", mode], cwd=directory,
+                                    env=env, capture_output=True, text=True, check=True)
+            samples.append([float(value) for value in result.stdout.split()[-3:]])
+    samples.sort(key=lambda sample: sample[2])
+    return samples[len(samples) // 2]
+
+
+def main():
+    if "--paint" in sys.argv:
+        run_paint(sys.argv[sys.argv.index("--paint") + 1])
+        return
+    
+    print(f"{'Модуль':<24} {'Импорт, мс':>11} {'PIL':>5} {'QtWidgets':>10}")
+    for module in MODULES:
+        cost, loaded = min((import_cost(module) for _ in range(RUNS)), key=lambda item: item[0])
+        flags = ["да" if flag else "нет" for flag in loaded]
+        print(f"{module:<24} {cost:>11.1f} {flags[0]:>5} {flags[1]:>10}")
+    
+    print()
+    print(f"{'Вариант':<10} {'Импорт, с':>10} {'Окно, с':>10} {'Первый кадр, с':>15}")
+    for mode in ("eager", "lazy"):
+        imported, constructed, painted = measure_paint(mode)
+        print(f"{mode:<10} {imported:>10.3f} {constructed:>10.3f} {painted:>15.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QSize, Qt
+from PyQt6.QtGui import QGuiApplication, QImage, QColor, QPainter, QLinearGradient
+from src.cli import HeadlessRenderer
+from src.filter_pipeline import FilterPipeline
+from src.history_manager import HistoryManager
+from src.meme_renderer import MemeRenderer
+from src.render_spec import RenderSpec
+
+FULL_SIZE = (6000, 4000)
+PREVIEW = QSize(2880, 1620)
+STEPS = 200
+IMAGES = 5
+FILTERS = ["Нет", "Сепия", "Черно-белый"]
+
+
+def make_photo(size, tint):
+    image = QImage(size[0], size[1], QImage.Format.Format_RGB32)
+    gradient = QLinearGradient(0, 0, size[0], size[1])
+    gradient.setColorAt(0, QColor(tint, 60, 120))
+    gradient.setColorAt(1, QColor(220, 180, tint))
+    painter = QPainter(image)
+    painter.fillRect(image.rect(), gradient)
+    painter.end()
+    return image
+
+
+def state_for(step, image):
+    return {
+        'image': image,
+        'filter': FILTERS[step // 7 % len(FILTERS)],
+        'brightness': 100 + step % 40,
+        'contrast': 100,
+        'top_text': f"Шаг {step // 3}",
+        'bottom_text': "",
+    }
+
+
+def spec_for(state):
+    style = HeadlessRenderer.parse_style({})
+    return RenderSpec(
+        FilterPipeline([('filter', state['filter']), ('brightness', state['brightness'] / 100.0)]),
+        [{'position': 'top', 'text': state['top_text'], 'style': style}]
+    )
+
+
+def main():
+    app = QGuiApplication([sys.argv[0]])
+    previews = [make_photo(FULL_SIZE, 40 * i).scaled(PREVIEW, Qt.AspectRatioMode.KeepAspectRatio)
+                for i in range(IMAGES)]
+    
+    # Без склейки шагов: каждое изменение параметра - отдельная команда
+    history = HistoryManager(merge_ms=0)
+    history.reset(state_for(0, 0))
+    start = time.perf_counter()
+    for step in range(1, STEPS + 1):
+        image = step * IMAGES // (STEPS + 1)
+        state = state_for(step, image)
+        if image != history.state['image']:
+            history.record(state, {'before': previews[image - 1], 'after': previews[image]})
+        else:
+            history.record(state)
+    record_time = time.perf_counter() - start
+    
+    full_copy = FULL_SIZE[0] * FULL_SIZE[1] * 4
+    print(f"Шагов: {STEPS}, смен изображения: {IMAGES - 1}, исходник {FULL_SIZE[0]}x{FULL_SIZE[1]}")
+    print(f"  копия изображения на каждый шаг: {full_copy * STEPS / 2 ** 20:>10.1f} МБ")
+    print(f"  HistoryManager:                  {history.memory_usage() / 2 ** 20:>10.1f} МБ "
+          f"(шагов в истории: {len(history.undo_stack)}, запись: {record_time:.2f} с)")
+    
+    renderer = MemeRenderer()
+    source = previews[-1]
+    timings = {'undo': ([], []), 'redo': ([], [])}
+    renderer.render(source, spec_for(history.state))
+    for action in ['undo'] * 20 + ['redo'] * 20:
+        start = time.perf_counter()
+        getattr(history, action)()
+        replayed = time.perf_counter()
+        renderer.render(source, spec_for(history.state))
+        timings[action][0].append(replayed - start)
+        timings[action][1].append(time.perf_counter() - replayed)
+    for action, (replay, render) in timings.items():
+        replay.sort()
+        render.sort()
+        print(f"  {action}: шаг истории {replay[len(replay) // 2] * 1e6:.0f} мкс, "
+              f"перерисовка превью {render[len(render) // 2] * 1000:.1f} мс (медианы)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import Database
+from src.version_control import VersionControl
+
+EDITS = 500
+READS = 200
+CAPTION = "Когда наконец разобрался, почему сохранение мема занимает так много места в базе"
+FILTERS = ["Нет", "Сепия", "Черно-белый"]
+COLORS = ["#ffffff", "#ffff00", "#ff0000"]
+
+
+def edit_states(count):
+    # Правки как в редакторе: набор и удаление символов, иногда смена фильтра или цвета
+    rng = random.Random(1)
+    top, bottom = "", "Низ"
+    text_color, filter_name = COLORS[0], FILTERS[0]
+    for step in range(count):
+        if step % 25 == 24:
+            filter_name = rng.choice(FILTERS)
+        elif step % 40 == 39:
+            text_color = rng.choice(COLORS)
+        elif len(top) < len(CAPTION) and rng.random() < 0.8:
+            top += CAPTION[len(top)]
+        else:
+            top = top[:-1]
+        yield (1, top, bottom, 48, text_color, "#000000", True, False, "meme.png", "Impact", filter_name)
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, "memes.db"))
+        states = list(edit_states(EDITS))
+        meme_id = db.save_meme(*states[0])
+        
+        start = time.perf_counter()
+        for state in states[1:]:
+            db.transaction(lambda uow, state=state: uow.update_meme(meme_id, *state))
+        db.flush()
+        write_time = time.perf_counter() - start
+        
+        versions = db.get_versions(meme_id)
+        full = sum(len(VersionControl.dumps(db.get_version(meme_id, number)).encode('utf-8'))
+                   for number, _, _, _ in versions)
+        stored = db._read("SELECT SUM(LENGTH(CAST(version_data AS BLOB))) FROM meme_versions").fetchone()[0]
+        keyframes = sum(1 for _, _, keyframe, _ in versions if keyframe)
+        print(f"Версий: {len(versions)} (ключевых кадров: {keyframes}), "
+              f"запись: {write_time / len(states) * 1000:.2f} мс на версию")
+        print(f"  полное состояние в каждой версии: {full / 1024:>7.1f} КБ")
+        print(f"  цепочка разниц:                   {stored / 1024:>7.1f} КБ")
+        
+        rng = random.Random(2)
+        timings = []
+        for _ in range(READS):
+            number = rng.randint(1, len(versions))
+            start = time.perf_counter()
+            db.get_version(meme_id, number)
+            timings.append(time.perf_counter() - start)
+        print(f"  get_version: {median(timings) * 1e6:.0f} мкс (медиана), худший {max(timings) * 1e6:.0f} мкс")
+        
+        start = time.perf_counter()
+        db.rollback_meme(meme_id, len(versions) // 2)
+        print(f"  откат: {(time.perf_counter() - start) * 1000:.2f} мс")
+        
+        start = time.perf_counter()
+        saved = db.compact_versions(meme_id, keep=100)
+        stored = db._read("SELECT SUM(LENGTH(CAST(version_data AS BLOB))) FROM meme_versions").fetchone()[0]
+        print(f"  сжатие до 100 последних версий: {(time.perf_counter() - start) * 1000:.1f} мс, "
+              f"освобождено {saved / 1024:.1f} КБ, осталось {stored / 1024:.1f} КБ")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
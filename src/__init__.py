@@ -1,13 +1,33 @@
-from .main_window import MemeGeneratorPro
-from .image_processor import ImageProcessor
-from .text_manager import TextManager
-from .meme_renderer import MemeRenderer
-from .database import Database
-from .export_manager import ExportManager
-from .filter_manager import FilterManager
-from .random_meme_generator import RandomMemeGenerator
-from .statistics_dialog import StatisticsDialog
-from .text_style_dialog import TextStyleDialog
-from .constants import *
+import importlib
+
+# Модули загружаются при первом обращении к имени: `import src` не тянет QtWidgets и PIL,
+# поэтому CLI и пакетная обработка работают без оконной части
+_EXPORTS = {
+    'MemeGeneratorPro': '.main_window',
+    'ImageProcessor': '.image_processor',
+    'TextManager': '.text_manager',
+    'MemeRenderer': '.meme_renderer',
+    'Database': '.database',
+    'ExportManager': '.export_manager',
+    'FilterManager': '.filter_manager',
+    'RandomMemeGenerator': '.random_meme_generator',
+    'StatisticsDialog': '.statistics_dialog',
+    'TextStyleDialog': '.text_style_dialog',
+}
 
 __version__ = "1.0"
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        constants = importlib.import_module('.constants', __name__)
+        if name.isupper() and hasattr(constants, name):
+            return getattr(constants, name)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,69 @@
+# Чтения ждут только записей в свои таблицы (Database._read), поэтому таблицы указаны у каждого запроса
+class Analytics:
+    def __init__(self, db):
+        self.db = db
+    
+    @staticmethod
+    def _period(days):
+        # None - за все время; иначе последние days дней, включая сегодняшний
+        if days is None:
+            return "", ()
+        return "WHERE day >= date('now', ?)", (f"-{max(1, int(days)) - 1} days",)
+    
+    def top_memes(self, days=7, metric='views', limit=10):
+        if metric not in ('views', 'downloads'):
+            raise ValueError(f"Неизвестная метрика: {metric}")
+        
+        if days is None:
+            # За все время сводка не нужна: сырые счетчики отсортированы индексами statistics
+            cursor = self.db._read(f'''SELECT s.meme_id, m.top_text, m.bottom_text, s.views, s.downloads
+                                      FROM statistics s
+                                      JOIN memes m ON m.id = s.meme_id
+                                      ORDER BY s.{metric} DESC, s.meme_id DESC
+                                      LIMIT ?''', (limit,), ('statistics', 'memes'))
+            return cursor.fetchall()
+        
+        where, params = Analytics._period(days)
+        cursor = self.db._read(f'''SELECT t.meme_id, m.top_text, m.bottom_text, t.views, t.downloads
+                                  FROM (SELECT meme_id, SUM(views) AS views, SUM(downloads) AS downloads
+                                        FROM daily_meme_stats
+                                        {where}
+                                        GROUP BY meme_id
+                                        ORDER BY {metric} DESC, meme_id DESC
+                                        LIMIT ?) t
+                                  JOIN memes m ON m.id = t.meme_id
+                                  ORDER BY t.{metric} DESC, t.meme_id DESC''', params + (limit,),
+                               ('daily_meme_stats', 'memes'))
+        return cursor.fetchall()
+    
+    def usage(self, kind, days=None):
+        where, params = Analytics._period(days)
+        where = f"{where} AND kind = ?" if where else "WHERE kind = ?"
+        cursor = self.db._read(f'''SELECT name, SUM(memes), SUM(views), SUM(downloads)
+                                  FROM daily_usage
+                                  {where}
+                                  GROUP BY name
+                                  ORDER BY SUM(memes) DESC, name''', params + (kind,), ('daily_usage',))
+        return cursor.fetchall()
+    
+    def font_usage(self, days=None):
+        return self.usage('font', days)
+    
+    def filter_usage(self, days=None):
+        return self.usage('filter', days)
+    
+    def time_series(self, days=30):
+        where, params = Analytics._period(days)
+        cursor = self.db._read(f'''SELECT day, memes, views, downloads
+                                  FROM daily_totals
+                                  {where}
+                                  ORDER BY day''', params, ('daily_totals',))
+        return cursor.fetchall()
+    
+    def totals(self, days=None):
+        where, params = Analytics._period(days)
+        cursor = self.db._read(f'''SELECT COALESCE(SUM(memes), 0), COALESCE(SUM(views), 0),
+                                  COALESCE(SUM(downloads), 0)
+                                  FROM daily_totals
+                                  {where}''', params, ('daily_totals',))
+        return cursor.fetchone()
@@ -0,0 +1,138 @@
+import os
+import sys
+import csv
+import json
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from .cli import DEFAULT_STYLE, read_jobs
+from .image_store import ImageStore
+
+BOOLEAN_FIELDS = ('has_outline', 'has_shadow', 'has_gradient')
+DB_CHUNK_SIZE = 500
+
+_worker_renderer = None
+
+def _init_worker():
+    global _worker_renderer
+    from .cli import HeadlessRenderer
+    _worker_renderer = HeadlessRenderer()
+
+def _render_in_worker(job):
+    try:
+        result = _worker_renderer.render_job(job)
+        result['content_hash'], result['file_size'], result['mtime_ns'] = ImageStore.fingerprint(job['image'])
+        result['ok'] = True
+    except Exception as e:
+        result = {'image': job.get('image'), 'output': job.get('output'), 'ok': False, 'error': str(e)}
+    return result
+
+class BatchProcessor:
+    def __init__(self, workers=None, db=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.db = db
+    
+    @staticmethod
+    def load_manifest(path):
+        if path.lower().endswith('.csv'):
+            return BatchProcessor._load_csv(path)
+        return list(read_jobs(path))
+    
+    @staticmethod
+    def _load_csv(path):
+        jobs = []
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                row = {key: value for key, value in row.items() if value not in (None, '')}
+                style = json.loads(row.pop('style')) if 'style' in row else {}
+                
+                for key in DEFAULT_STYLE:
+                    if key in row:
+                        style[key] = row.pop(key)
+                for key in BOOLEAN_FIELDS:
+                    if isinstance(style.get(key), str):
+                        style[key] = style[key].strip().lower() in ('1', 'true', 'yes', 'да')
+                
+                row['style'] = style
+                jobs.append(row)
+        return jobs
+    
+    def run(self, jobs, progress=None):
+        jobs = list(jobs)
+        results = []
+        succeeded = []
+        
+        if not jobs:
+            return results
+        
+        # spawn, а не fork: дочерние процессы не наследуют состояние Qt родителя
+        context = multiprocessing.get_context('spawn')
+        chunksize = max(1, len(jobs) // (self.workers * 8))
+        
+        with ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker) as executor:
+            for index, (job, result) in enumerate(zip(jobs, executor.map(_render_in_worker, jobs, chunksize=chunksize))):
+                results.append(result)
+                if result['ok']:
+                    succeeded.append(BatchProcessor._meme_record(job, result))
+                if self.db and len(succeeded) >= DB_CHUNK_SIZE:
+                    self.db.save_memes_bulk(succeeded)
+                    succeeded = []
+                if progress:
+                    progress(index + 1, len(jobs), result)
+        
+        if self.db and succeeded:
+            self.db.save_memes_bulk(succeeded)
+        
+        return results
+    
+    @staticmethod
+    def _meme_record(job, result):
+        style = dict(DEFAULT_STYLE)
+        style.update(job.get('style') or {})
+        return {
+            'image': result['image'],
+            'width': result['width'],
+            'height': result['height'],
+            'top': job.get('top') or '',
+            'bottom': job.get('bottom') or '',
+            'font_size': int(style['size']),
+            'text_color': style['color'],
+            'outline_color': style['outline_color'],
+            'has_outline': bool(style['has_outline']),
+            'has_shadow': bool(style['has_shadow']),
+            'output': result['output'],
+            'content_hash': result['content_hash'],
+            'file_size': result['file_size'],
+            'mtime_ns': result['mtime_ns'],
+            'font': style['font'],
+            'filter': job.get('filter') or "Нет"
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетная обработка мемов")
+    parser.add_argument('manifest', help="CSV или JSONL файл с заданиями")
+    parser.add_argument('--workers', type=int, default=None, help="число процессов (по умолчанию - число ядер)")
+    parser.add_argument('--no-db', action='store_true', help="не записывать результаты в базу данных")
+    args = parser.parse_args(argv)
+    
+    db = None
+    if not args.no_db:
+        from .database import Database
+        db = Database()
+    
+    def report(done, total, result):
+        status = "ok" if result['ok'] else f"ошибка: {result['error']}"
+        print(f"[{done}/{total}] {result.get('image')}: {status}", file=sys.stderr, flush=True)
+    
+    processor = BatchProcessor(args.workers, db)
+    results = processor.run(BatchProcessor.load_manifest(args.manifest), report)
+    
+    failed = [result for result in results if not result['ok']]
+    print(f"Готово: {len(results) - len(failed)} из {len(results)}, ошибок: {len(failed)}", file=sys.stderr)
+    
+    if db:
+        db.close()
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import argparse
+from PyQt6.QtGui import QGuiApplication, QImageReader, QColor
+from .filter_pipeline import FilterPipeline
+from .meme_renderer import MemeRenderer
+from .render_spec import RenderSpec
+from .export_engine import ExportEngine, EXPORT_FORMATS
+
+DEFAULT_STYLE = {
+    'font': 'Impact',
+    'size': 48,
+    'color': '#ffffff',
+    'outline_color': '#000000',
+    'has_outline': True,
+    'has_shadow': False,
+    'has_gradient': False,
+    'gradient_type': 'Линейный'
+}
+
+class HeadlessRenderer:
+    def __init__(self, max_text_layers=2):
+        self.app = HeadlessRenderer.ensure_app()
+        self.renderer = MemeRenderer(max_text_layers, max_base_layers=1)
+    
+    @staticmethod
+    def ensure_app():
+        app = QGuiApplication.instance()
+        if app is None:
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+            app = QGuiApplication([sys.argv[0]])
+        return app
+    
+    @staticmethod
+    def parse_style(data=None):
+        style = dict(DEFAULT_STYLE)
+        style.update(data or {})
+        style['size'] = int(style['size'])
+        style['color'] = QColor(style['color'])
+        style['outline_color'] = QColor(style['outline_color'])
+        return style
+    
+    @staticmethod
+    def parse_encoder_options(data=None):
+        # В CSV-манифесте параметры кодировщика приходят JSON-строкой
+        if isinstance(data, str):
+            data = json.loads(data)
+        return dict(data or {})
+    
+    @staticmethod
+    def parse_max_bytes(value=None):
+        if value in (None, ''):
+            return None
+        return int(value)
+    
+    @staticmethod
+    def load_image(path):
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        image = reader.read()
+        if image.isNull():
+            raise ValueError(f"Не удалось загрузить изображение {path}: {reader.errorString()}")
+        return image
+    
+    @staticmethod
+    def build_captions(job):
+        style = HeadlessRenderer.parse_style(job.get('style'))
+        captions = []
+        for position in ('top', 'bottom'):
+            text = (job.get(position) or '').strip()
+            if text:
+                captions.append({'position': position, 'text': text, 'style': style})
+        return captions
+    
+    @staticmethod
+    def build_pipeline(job):
+        return FilterPipeline([
+            ('filter', job.get('filter') or "Нет"),
+            ('brightness', float(job.get('brightness', 1.0))),
+            ('contrast', float(job.get('contrast', 1.0)))
+        ])
+    
+    @staticmethod
+    def build_spec(job):
+        return RenderSpec(HeadlessRenderer.build_pipeline(job), HeadlessRenderer.build_captions(job))
+    
+    def render_job(self, job):
+        source = HeadlessRenderer.load_image(job['image'])
+        image = self.renderer.render(source, HeadlessRenderer.build_spec(job))
+        
+        output = job['output']
+        options = HeadlessRenderer.parse_encoder_options(job.get('encoder_options'))
+        if int(job.get('quality', -1)) >= 0:
+            options['quality'] = int(job['quality'])
+        max_bytes = HeadlessRenderer.parse_max_bytes(job.get('max_bytes'))
+        saved = ExportEngine.save(image, output, job.get('format'), options, max_bytes)
+        
+        return {
+            'image': job['image'],
+            'output': output,
+            'width': source.width(),
+            'height': source.height(),
+            'bytes': saved['bytes'],
+            'target_met': saved['target_met']
+        }
+
+def read_jobs(source):
+    stream = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    try:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def parse_json_argument(value):
+    if not value:
+        return None
+    if os.path.exists(value):
+        with open(value, encoding='utf-8') as f:
+            return json.load(f)
+    return json.loads(value)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Генерация мемов без графического интерфейса")
+    parser.add_argument('image', nargs='?', help="исходное изображение")
+    parser.add_argument('-o', '--output', help="файл результата")
+    parser.add_argument('--top', default='', help="верхний текст")
+    parser.add_argument('--bottom', default='', help="нижний текст")
+    parser.add_argument('--style', help="стиль текста: JSON-строка или путь к JSON-файлу")
+    parser.add_argument('--filter', default="Нет", help="фильтр: Нет, Черно-белый, Сепия, Размытие, Контраст, Яркость")
+    parser.add_argument('--brightness', type=float, default=1.0)
+    parser.add_argument('--contrast', type=float, default=1.0)
+    parser.add_argument('--quality', type=int, default=-1)
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), help="формат результата (по умолчанию - по расширению)")
+    parser.add_argument('--encoder-options', help="параметры кодировщика: JSON-строка или путь к JSON-файлу")
+    parser.add_argument('--max-bytes', type=int, help="подобрать качество так, чтобы файл уложился в лимит")
+    parser.add_argument('--jobs', help="JSONL-файл с заданиями (или - для stdin), по одному мему на строку")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    if args.jobs:
+        jobs = read_jobs(args.jobs)
+    elif args.image and args.output:
+        jobs = [{
+            'image': args.image,
+            'output': args.output,
+            'top': args.top,
+            'bottom': args.bottom,
+            'style': parse_json_argument(args.style),
+            'filter': args.filter,
+            'brightness': args.brightness,
+            'contrast': args.contrast,
+            'quality': args.quality,
+            'format': args.format,
+            'encoder_options': parse_json_argument(args.encoder_options),
+            'max_bytes': args.max_bytes
+        }]
+    else:
+        parser.error("нужно указать изображение и --output или --jobs")
+    
+    renderer = HeadlessRenderer()
+    failures = 0
+    for job in jobs:
+        try:
+            result = renderer.render_job(job)
+            result['ok'] = True
+        except Exception as e:
+            failures += 1
+            result = {'image': job.get('image'), 'ok': False, 'error': str(e)}
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,40 @@
-from PyQt6.QtGui import QColor
-
 APP_NAME = "Meme Generator Pro"
 APP_VERSION = "2.0"
-DEFAULT_TEXT_COLOR = QColor(255, 255, 255)
-DEFAULT_OUTLINE_COLOR = QColor(0, 0, 0)
+DEFAULT_TEXT_COLOR = "#ffffff"
+DEFAULT_OUTLINE_COLOR = "#000000"
 MIN_FONT_SIZE = 10
 MAX_FONT_SIZE = 150
 DEFAULT_FONT_SIZE = 48
+PREVIEW_HEADROOM = 1.5
+PREVIEW_INTERVAL_MS = 16
+MIN_PREVIEW_INTERVAL_MS = 1
+TEXT_LAYER_CACHE_SIZE = 8
+BASE_LAYER_CACHE_SIZE = 2
+RENDER_REFERENCE_SIZE = 800
+GLYPH_PATH_CACHE_SIZE = 64
+DATABASE_PATH = "data/memes.db"
+DB_SYNCHRONOUS = "NORMAL"
+DB_WRITE_BATCH_SIZE = 256
+STATISTICS_PAGE_SIZE = 200
+EXPORT_CHUNK_SIZE = 5000
+EXPORT_MIN_QUALITY = 10
+# Профиль экспорта: набор (формат, наибольшая сторона или None - исходный размер, качество или None)
+EXPORT_PROFILES = {
+    "Публикация": (
+        ('png', None, None),
+        ('jpeg', 1080, 85),
+        ('jpeg', 320, 80),
+    ),
+}
+FINGERPRINT_SAMPLE_SIZE = 64 * 1024
+THUMBNAIL_SIZE = 160
+THUMBNAIL_CACHE_BYTES = 64 * 1024 * 1024
+HISTORY_LIMIT = 5000
+UNDO_MAX_STEPS = 200
+UNDO_MEMORY_BYTES = 64 * 1024 * 1024
+UNDO_MERGE_MS = 800
+UNDO_TILE_SIZE = 256
+VERSION_KEYFRAME_INTERVAL = 32
 
 RANDOM_TEXTS = [
     "Когда код заработал\nс первого раза",
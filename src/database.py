@@ -1,133 +1,374 @@
-import sqlite3
 import os
 import json
 import csv
+import gzip
+import threading
+from .constants import DATABASE_PATH, STATISTICS_PAGE_SIZE, EXPORT_CHUNK_SIZE
+from .database_writer import DatabaseWriter
+from .migrations import migrate
+from .version_control import VersionControl
 
-class Database:
-    def __init__(self):
-        os.makedirs("data", exist_ok=True)
-        self.conn = sqlite3.connect("data/memes.db")
-        self.create_tables()
+# (колонка сортировки, колонка для разрешения равенства) в порядке колонок таблицы статистики
+STATISTICS_SORT_KEYS = [
+    ('m.id', 'm.id'),
+    ('m.top_text', 'm.id'),
+    ('m.bottom_text', 'm.id'),
+    ('m.created_at', 'm.id'),
+    ('s.views', 's.meme_id'),
+    ('s.downloads', 's.meme_id'),
+    ('s.likes', 's.meme_id'),
+]
+
+EXPORT_HEADERS = ['ID', 'Верхний текст', 'Нижний текст', 'Дата создания', 
+                  'Просмотры', 'Скачивания', 'Лайки']
+EXPORT_FIELDS = ['id', 'top_text', 'bottom_text', 'created_at', 'views', 'downloads', 'likes']
+
+# Таблицы, которые меняют записи: чтение ждет только незавершенные записи в те таблицы, что читает
+COUNTER_TABLES = ('statistics', 'daily_totals', 'daily_meme_stats', 'daily_usage')
+MEME_TABLES = ('images', 'memes', 'meme_outputs', 'meme_versions') + COUNTER_TABLES
+
+class UnitOfWork:
+    def __init__(self, cursor):
+        self.cursor = cursor
     
-    def create_tables(self):
-        cursor = self.conn.cursor()
-        cursor.execute('''CREATE TABLE IF NOT EXISTS images 
-                         (id INTEGER PRIMARY KEY, path TEXT, width INTEGER, height INTEGER, 
-                          created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-        
-        cursor.execute('''CREATE TABLE IF NOT EXISTS memes 
-                         (id INTEGER PRIMARY KEY, image_id INTEGER, top_text TEXT, bottom_text TEXT, 
-                          font_size INTEGER, text_color TEXT, outline_color TEXT, has_outline BOOLEAN, 
-                          has_shadow BOOLEAN, output_path TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                          FOREIGN KEY (image_id) REFERENCES images (id))''')
-        
-        cursor.execute('''CREATE TABLE IF NOT EXISTS meme_versions 
-                         (id INTEGER PRIMARY KEY, meme_id INTEGER, version_data TEXT, 
-                          created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, 
-                          FOREIGN KEY (meme_id) REFERENCES memes (id))''')
-        
-        cursor.execute('''CREATE TABLE IF NOT EXISTS statistics 
-                         (id INTEGER PRIMARY KEY, meme_id INTEGER, views INTEGER DEFAULT 0,
-                          downloads INTEGER DEFAULT 0, likes INTEGER DEFAULT 0,
-                          last_viewed TIMESTAMP, FOREIGN KEY (meme_id) REFERENCES memes (id))''')
-        
-        cursor.execute('''CREATE TABLE IF NOT EXISTS user_settings 
-                         (id INTEGER PRIMARY KEY, setting_name TEXT UNIQUE, setting_value TEXT,
-                          updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    def save_image(self, path, width, height):
+        self.cursor.execute('''INSERT INTO images (path, width, height, last_used_at) 
+                         VALUES (?, ?, ?, CURRENT_TIMESTAMP)''', (path, width, height))
+        return self.cursor.lastrowid
+    
+    def store_image(self, path, width, height, content_hash, file_size, mtime_ns):
+        # Одно и то же содержимое - одна строка: повторная загрузка обновляет путь и время
+        row = self.cursor.execute('''SELECT id FROM images WHERE content_hash = ? AND file_size = ?
+                                    ORDER BY id LIMIT 1''', (content_hash, file_size)).fetchone()
+        if row:
+            self.cursor.execute('''UPDATE images SET path = ?, mtime_ns = ?, last_used_at = CURRENT_TIMESTAMP
+                                 WHERE id = ?''', (path, mtime_ns, row[0]))
+            return row[0]
         
-        self.conn.commit()
+        self.cursor.execute('''INSERT INTO images (path, width, height, content_hash, file_size, mtime_ns, last_used_at) 
+                         VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)''',
+                      (path, width, height, content_hash, file_size, mtime_ns))
+        return self.cursor.lastrowid
     
-    def save_image(self, path, width, height):
-        cursor = self.conn.cursor()
-        cursor.execute("INSERT INTO images (path, width, height) VALUES (?, ?, ?)", 
-                      (path, width, height))
-        self.conn.commit()
-        return cursor.lastrowid
+    def touch_image(self, image_id):
+        self.cursor.execute("UPDATE images SET last_used_at = CURRENT_TIMESTAMP WHERE id = ?", (image_id,))
     
     def save_meme(self, image_id, top_text, bottom_text, font_size, text_color, 
-                  outline_color, has_outline, has_shadow, output_path):
-        cursor = self.conn.cursor()
+                  outline_color, has_outline, has_shadow, output_path, font=None, filter_name=None):
+        cursor = self.cursor
         cursor.execute('''INSERT INTO memes (image_id, top_text, bottom_text, font_size, 
-                         text_color, outline_color, has_outline, has_shadow, output_path) 
-                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', 
+                         text_color, outline_color, has_outline, has_shadow, output_path, font, filter) 
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', 
                       (image_id, top_text, bottom_text, font_size, text_color, 
-                       outline_color, has_outline, has_shadow, output_path))
+                       outline_color, has_outline, has_shadow, output_path, font, filter_name))
         meme_id = cursor.lastrowid
         
-        cursor.execute('''INSERT INTO meme_versions (meme_id, version_data) 
-                         VALUES (?, ?)''', 
-                      (meme_id, json.dumps({
-                          'top_text': top_text, 
-                          'bottom_text': bottom_text, 
-                          'font_size': font_size, 
-                          'text_color': text_color, 
-                          'outline_color': outline_color
-                      })))
+        if output_path:
+            cursor.execute("INSERT INTO meme_outputs (meme_id, path) VALUES (?, ?)", (meme_id, output_path))
+        
+        VersionControl.append(cursor.execute, meme_id, VersionControl.state(
+            image_id, top_text, bottom_text, font_size, text_color,
+            outline_color, has_outline, has_shadow, font, filter_name
+        ))
         
         cursor.execute('''INSERT INTO statistics (meme_id, views, downloads, likes) 
                          VALUES (?, 0, 0, 0)''', (meme_id,))
         
-        self.conn.commit()
+        self._roll_up(meme_id, memes=1)
         return meme_id
     
-    def get_recent_images(self, limit=10):
+    def update_meme(self, meme_id, image_id, top_text, bottom_text, font_size, text_color, 
+                    outline_color, has_outline, has_shadow, output_path, font=None, filter_name=None):
+        # Повторное сохранение мема с тем же изображением - его новая версия. None - мема нет
+        # или изображение другое, тогда сохраняется новый мем
+        self.cursor.execute('''UPDATE memes SET top_text = ?, bottom_text = ?, font_size = ?, text_color = ?,
+                             outline_color = ?, has_outline = ?, has_shadow = ?, output_path = ?, font = ?,
+                             filter = ? WHERE id = ? AND image_id IS ?''',
+                          (top_text, bottom_text, font_size, text_color, outline_color, has_outline,
+                           has_shadow, output_path, font, filter_name, meme_id, image_id))
+        if self.cursor.rowcount == 0:
+            return None
+        
+        return VersionControl.append(self.cursor.execute, meme_id, VersionControl.state(
+            image_id, top_text, bottom_text, font_size, text_color,
+            outline_color, has_outline, has_shadow, font, filter_name
+        ))
+    
+    def rollback_meme(self, meme_id, version):
+        return VersionControl.rollback(self.cursor.execute, meme_id, version)
+    
+    def compact_versions(self, meme_id=None, keep=None):
+        if meme_id is None:
+            meme_ids = [row[0] for row in self.cursor.execute(
+                "SELECT DISTINCT meme_id FROM meme_versions").fetchall()]
+        else:
+            meme_ids = [meme_id]
+        return sum(VersionControl.compact(self.cursor.execute, meme_id, keep) for meme_id in meme_ids)
+    
+    def save_memes_bulk(self, memes):
+        meme_ids = []
+        for meme in memes:
+            if meme.get('content_hash'):
+                image_id = self.store_image(meme['image'], meme['width'], meme['height'],
+                                            meme['content_hash'], meme['file_size'], meme['mtime_ns'])
+            else:
+                image_id = self.save_image(meme['image'], meme['width'], meme['height'])
+            meme_ids.append(self.save_meme(
+                image_id, meme['top'], meme['bottom'], meme['font_size'],
+                meme['text_color'], meme['outline_color'], meme['has_outline'],
+                meme['has_shadow'], meme['output'], meme.get('font'), meme.get('filter')
+            ))
+        return meme_ids
+    
+    def save_outputs(self, meme_id, outputs):
+        # Описание уже записанного файла дополняется, новые файлы добавляются к тому же мему
+        for output in outputs:
+            params = (output.get('format'), output.get('width'), output.get('height'), output.get('bytes'))
+            self.cursor.execute('''UPDATE meme_outputs SET format = ?, width = ?, height = ?, file_size = ?
+                                 WHERE meme_id = ? AND path = ?''', params + (meme_id, output['path']))
+            if self.cursor.rowcount == 0:
+                self.cursor.execute('''INSERT INTO meme_outputs (format, width, height, file_size, meme_id, path)
+                                     VALUES (?, ?, ?, ?, ?, ?)''', params + (meme_id, output['path']))
+    
+    def increment_views(self, meme_id):
+        self.cursor.execute('''UPDATE statistics SET views = views + 1, 
+                         last_viewed = CURRENT_TIMESTAMP WHERE meme_id = ?''', (meme_id,))
+        self._roll_up(meme_id, views=1)
+    
+    def increment_downloads(self, meme_id):
+        self.cursor.execute('UPDATE statistics SET downloads = downloads + 1 WHERE meme_id = ?', (meme_id,))
+        self._roll_up(meme_id, downloads=1)
+    
+    def _roll_up(self, meme_id, memes=0, views=0, downloads=0):
+        # Дневные агрегаты обновляются в той же транзакции, что и сырые счетчики
+        cursor = self.cursor
+        cursor.execute('''INSERT INTO daily_totals (day, memes, views, downloads)
+                         VALUES (date('now'), ?, ?, ?)
+                         ON CONFLICT (day) DO UPDATE SET memes = memes + excluded.memes,
+                         views = views + excluded.views, downloads = downloads + excluded.downloads''',
+                      (memes, views, downloads))
+        
+        if views or downloads:
+            cursor.execute('''INSERT INTO daily_meme_stats (day, meme_id, views, downloads)
+                             VALUES (date('now'), ?, ?, ?)
+                             ON CONFLICT (day, meme_id) DO UPDATE SET views = views + excluded.views,
+                             downloads = downloads + excluded.downloads''', (meme_id, views, downloads))
+        
+        row = cursor.execute("SELECT font, filter FROM memes WHERE id = ?", (meme_id,)).fetchone()
+        if row is None:
+            return
+        for kind, name in zip(('font', 'filter'), row):
+            if name:
+                cursor.execute('''INSERT INTO daily_usage (day, kind, name, memes, views, downloads)
+                                 VALUES (date('now'), ?, ?, ?, ?, ?)
+                                 ON CONFLICT (day, kind, name) DO UPDATE SET memes = memes + excluded.memes,
+                                 views = views + excluded.views, downloads = downloads + excluded.downloads''',
+                              (kind, name, memes, views, downloads))
+    
+    def save_setting(self, name, value):
+        self.cursor.execute('''INSERT OR REPLACE INTO user_settings (setting_name, setting_value) 
+                         VALUES (?, ?)''', (name, value))
+
+class Database:
+    def __init__(self, path=DATABASE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # Все записи идут через один поток-писатель, чтения - через отдельное соединение (WAL)
+        self.path = path
+        self.writer = DatabaseWriter(path)
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.writer.execute(migrate)
+        self.conn = DatabaseWriter.connect(path)
+    
+    def transaction(self, work, tables=None):
+        # work(uow) выполняется в потоке-писателе целиком в одной транзакции.
+        # tables - таблицы, которые меняет work; None - неизвестно какие, тогда его ждет любое чтение
+        future = self.writer.submit(lambda cursor: work(UnitOfWork(cursor)))
+        with self.lock:
+            for table in tables or ('*',):
+                self.pending[table] = future.sequence
+        return future
+    
+    def flush(self):
+        self.writer.flush()
+    
+    def save_image(self, path, width, height):
+        return self.transaction(lambda uow: uow.save_image(path, width, height), ('images',)).result()
+    
+    def store_image(self, path, width, height, content_hash, file_size, mtime_ns):
+        return self.transaction(lambda uow: uow.store_image(
+            path, width, height, content_hash, file_size, mtime_ns
+        ), ('images',)).result()
+    
+    def find_image(self, path, file_size, mtime_ns):
+        cursor = self._read('''SELECT id, width, height FROM images
+                             WHERE path = ? AND file_size = ? AND mtime_ns = ?
+                             ORDER BY id LIMIT 1''', (path, file_size, mtime_ns), ('images',))
+        return cursor.fetchone()
+    
+    def find_image_by_content(self, content_hash, file_size):
+        cursor = self._read('''SELECT id, width, height FROM images
+                             WHERE content_hash = ? AND file_size = ?
+                             ORDER BY id LIMIT 1''', (content_hash, file_size), ('images',))
+        return cursor.fetchone()
+    
+    def touch_image(self, image_id):
+        return self.transaction(lambda uow: uow.touch_image(image_id), ('images',))
+    
+    def save_meme(self, image_id, top_text, bottom_text, font_size, text_color, 
+                  outline_color, has_outline, has_shadow, output_path, font=None, filter_name=None):
+        return self.transaction(lambda uow: uow.save_meme(
+            image_id, top_text, bottom_text, font_size, text_color,
+            outline_color, has_outline, has_shadow, output_path, font, filter_name
+        ), MEME_TABLES).result()
+    
+    def save_memes_bulk(self, memes):
+        return self.transaction(lambda uow: uow.save_memes_bulk(memes), MEME_TABLES).result()
+    
+    def _read(self, query, params=(), tables=None):
+        # Чтение ждет только поставленные раньше записи в свои таблицы (tables=None - в любые),
+        # если они еще не выполнены; остальная очередь записи его не задерживает
+        with self.lock:
+            if tables is None:
+                sequence = max(self.pending.values(), default=0)
+            else:
+                sequence = max(self.pending.get(table, 0) for table in tables + ('*',))
+        if sequence > self.writer.completed:
+            self.writer.wait_for(sequence)
         cursor = self.conn.cursor()
-        cursor.execute("SELECT path FROM images ORDER BY created_at DESC LIMIT ?", (limit,))
+        cursor.execute(query, params)
+        return cursor
+    
+    def get_recent_images(self, limit=10):
+        cursor = self._read("SELECT path FROM images ORDER BY last_used_at DESC LIMIT ?", (limit,), ('images',))
         return [row[0] for row in cursor.fetchall()]
     
     def get_recent_memes(self, limit=10):
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT output_path FROM memes ORDER BY created_at DESC LIMIT ?', (limit,))
+        # Все сохраненные файлы: у мема с несколькими версиями или экспортами их несколько,
+        # а memes.output_path хранит только последний
+        cursor = self._read('''SELECT path FROM meme_outputs ORDER BY created_at DESC, id DESC LIMIT ?''',
+                            (limit,), ('meme_outputs',))
         return [row[0] for row in cursor.fetchall()]
     
+    def get_meme_outputs(self, meme_id):
+        cursor = self._read('''SELECT path, format, width, height, file_size FROM meme_outputs
+                             WHERE meme_id = ? ORDER BY id''', (meme_id,), ('meme_outputs',))
+        return cursor.fetchall()
+    
+    def get_version(self, meme_id, version=None):
+        # version=None - последняя версия; None, если такой версии нет
+        return VersionControl.load(self._read_versions, meme_id, version)
+    
+    def get_versions(self, meme_id):
+        return VersionControl.history(self._read_versions, meme_id)
+    
+    def _read_versions(self, query, params):
+        return self._read(query, params, ('meme_versions',))
+    
+    def rollback_meme(self, meme_id, version):
+        return self.transaction(lambda uow: uow.rollback_meme(meme_id, version), MEME_TABLES).result()
+    
+    def compact_versions(self, meme_id=None, keep=None):
+        return self.transaction(lambda uow: uow.compact_versions(meme_id, keep), MEME_TABLES).result()
+    
     def increment_views(self, meme_id):
-        cursor = self.conn.cursor()
-        cursor.execute('''UPDATE statistics SET views = views + 1, 
-                         last_viewed = CURRENT_TIMESTAMP WHERE meme_id = ?''', (meme_id,))
-        self.conn.commit()
+        return self.transaction(lambda uow: uow.increment_views(meme_id), COUNTER_TABLES)
     
     def increment_downloads(self, meme_id):
-        cursor = self.conn.cursor()
-        cursor.execute('UPDATE statistics SET downloads = downloads + 1 WHERE meme_id = ?', (meme_id,))
-        self.conn.commit()
+        return self.transaction(lambda uow: uow.increment_downloads(meme_id), COUNTER_TABLES)
     
     def get_statistics(self):
-        cursor = self.conn.cursor()
-        cursor.execute('''SELECT m.id, m.top_text, m.bottom_text, m.created_at,
+        cursor = self._read('''SELECT m.id, m.top_text, m.bottom_text, m.created_at,
                          s.views, s.downloads, s.likes, s.last_viewed
                          FROM memes m
                          LEFT JOIN statistics s ON m.id = s.meme_id
-                         ORDER BY m.created_at DESC''')
+                         ORDER BY m.created_at DESC''', tables=('memes', 'statistics'))
+        return cursor.fetchall()
+    
+    def get_statistics_page(self, column=3, descending=True, after=None, limit=STATISTICS_PAGE_SIZE):
+        # Keyset-пагинация: следующая страница начинается после (значение колонки, id) последней строки
+        key, tiebreak = STATISTICS_SORT_KEYS[column]
+        direction, compare = ('DESC', '<') if descending else ('ASC', '>')
+        
+        where = ''
+        params = []
+        if after is not None:
+            where = f'WHERE ({key}, {tiebreak}) {compare} (?, ?)'
+            params.extend(after)
+        params.append(limit)
+        
+        cursor = self._read(f'''SELECT m.id, m.top_text, m.bottom_text, m.created_at,
+                             s.views, s.downloads, s.likes, s.last_viewed
+                             FROM memes m
+                             JOIN statistics s ON m.id = s.meme_id
+                             {where}
+                             ORDER BY {key} {direction}, {tiebreak} {direction}
+                             LIMIT ?''', params, ('memes', 'statistics'))
         return cursor.fetchall()
     
     def save_setting(self, name, value):
-        cursor = self.conn.cursor()
-        cursor.execute('''INSERT OR REPLACE INTO user_settings (setting_name, setting_value) 
-                         VALUES (?, ?)''', (name, value))
-        self.conn.commit()
+        return self.transaction(lambda uow: uow.save_setting(name, value), ('user_settings',))
     
     def get_setting(self, name, default=None):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT setting_value FROM user_settings WHERE setting_name = ?", (name,))
+        cursor = self._read("SELECT setting_value FROM user_settings WHERE setting_name = ?", (name,),
+                            ('user_settings',))
         result = cursor.fetchone()
         return result[0] if result else default
     
     def close(self):
+        self.writer.close()
         self.conn.close()
     
     def export_to_csv(self, filename):
-        cursor = self.conn.cursor()
-        cursor.execute('''SELECT m.id, m.top_text, m.bottom_text, m.created_at,
-                         s.views, s.downloads, s.likes
-                         FROM memes m
-                         LEFT JOIN statistics s ON m.id = s.meme_id''')
-        
-        rows = cursor.fetchall()
+        return self.export_statistics(filename)
+    
+    def export_statistics(self, filename, progress=None, is_cancelled=None, chunk_size=EXPORT_CHUNK_SIZE):
+        # Формат по расширению: .csv или .jsonl, плюс .gz для сжатия.
+        # Своё соединение: экспорт может идти из любого потока, строки читаются порциями
+        self.writer.flush()
+        conn = DatabaseWriter.connect(self.path)
+        exported = 0
         
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['ID', 'Верхний текст', 'Нижний текст', 'Дата создания', 
-                            'Просмотры', 'Скачивания', 'Лайки'])
+        try:
+            total = conn.execute("SELECT COUNT(*) FROM memes").fetchone()[0]
+            cursor = conn.execute('''SELECT m.id, m.top_text, m.bottom_text, m.created_at,
+                                    s.views, s.downloads, s.likes
+                                    FROM memes m
+                                    LEFT JOIN statistics s ON m.id = s.meme_id''')
             
-            for row in rows:
-                writer.writerow(row)
+            name = filename.lower()
+            if name.endswith('.gz'):
+                name = name[:-3]
+                output = gzip.open(filename, 'wt', compresslevel=6, newline='', encoding='utf-8')
+            else:
+                output = open(filename, 'w', newline='', encoding='utf-8-sig' if name.endswith('.csv') else 'utf-8')
+            
+            with output:
+                if name.endswith(('.jsonl', '.json')):
+                    def write_rows(rows):
+                        output.writelines(json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False) + '\n'
+                                          for row in rows)
+                else:
+                    writer = csv.writer(output)
+                    writer.writerow(EXPORT_HEADERS)
+                    write_rows = writer.writerows
+                
+                while True:
+                    if is_cancelled and is_cancelled():
+                        break
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    write_rows(rows)
+                    exported += len(rows)
+                    if progress:
+                        progress(exported, total)
+        finally:
+            conn.close()
+        
+        if is_cancelled and is_cancelled():
+            os.remove(filename)
+        return exported
@@ -0,0 +1,118 @@
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from .constants import DB_SYNCHRONOUS, DB_WRITE_BATCH_SIZE
+
+class DatabaseWriter(threading.Thread):
+    def __init__(self, path, batch_size=DB_WRITE_BATCH_SIZE):
+        super().__init__(name="DatabaseWriter", daemon=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.tasks = queue.Queue()
+        # Номера задач по порядку очереди: submitted - последняя поставленная, completed - последняя
+        # выполненная. По ним чтение ждет только нужные ему записи, а не всю очередь
+        self.condition = threading.Condition()
+        self.submitted = 0
+        self.completed = 0
+        self.transactions = 0
+        self.writes = 0
+        self.start()
+    
+    def submit(self, work):
+        future = Future()
+        with self.condition:
+            self.submitted += 1
+            future.sequence = self.submitted
+            self.tasks.put((work, future))
+        return future
+    
+    def wait_for(self, sequence):
+        with self.condition:
+            self.condition.wait_for(lambda: self.completed >= sequence)
+    
+    def execute(self, work):
+        return self.submit(work).result()
+    
+    def flush(self):
+        self.tasks.join()
+    
+    def close(self):
+        self.tasks.put(None)
+        self.join()
+    
+    def run(self):
+        conn = DatabaseWriter.connect(self.path)
+        # Транзакциями управляем сами: BEGIN на пачку задач, SAVEPOINT на каждую задачу
+        conn.isolation_level = None
+        cursor = conn.cursor()
+        running = True
+        
+        while running:
+            batch = [self.tasks.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.tasks.get_nowait())
+                except queue.Empty:
+                    break
+            
+            if None in batch:
+                running = False
+            tasks = [task for task in batch if task is not None]
+            
+            try:
+                if tasks:
+                    self._write_batch(conn, cursor, tasks)
+            finally:
+                # task_done вызывается при любой ошибке, иначе flush() будет ждать вечно
+                with self.condition:
+                    self.completed += len(tasks)
+                    self.condition.notify_all()
+                for _ in batch:
+                    self.tasks.task_done()
+        
+        conn.close()
+    
+    def _write_batch(self, conn, cursor, tasks):
+        results = []
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            
+            for work, future in tasks:
+                cursor.execute("SAVEPOINT task")
+                try:
+                    results.append((future, work(cursor), None))
+                    cursor.execute("RELEASE task")
+                except Exception as e:
+                    # Ошибка одной задачи откатывает только ее, остальная пачка сохраняется
+                    cursor.execute("ROLLBACK TO task")
+                    cursor.execute("RELEASE task")
+                    results.append((future, None, e))
+            
+            cursor.execute("COMMIT")
+        except Exception as e:
+            # BEGIN, COMMIT или служебная команда не прошли (база заблокирована, ошибка диска):
+            # пачка целиком не записана, ошибку получают все ее задачи, поток продолжает работу
+            try:
+                if conn.in_transaction:
+                    cursor.execute("ROLLBACK")
+            except Exception:
+                pass
+            results = [(future, None, e) for _, future in tasks]
+        
+        self.transactions += 1
+        self.writes += len(tasks)
+        
+        # Результаты отдаем только после COMMIT: ожидающий видит уже записанные данные
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+    
+    @staticmethod
+    def connect(path):
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={DB_SYNCHRONOUS}")
+        return conn
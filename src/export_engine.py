@@ -0,0 +1,234 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import Qt, QBuffer, QByteArray, QIODevice, QSize
+from PyQt6.QtGui import QImage, QImageWriter, QPainter
+from .constants import EXPORT_MIN_QUALITY
+
+# Кодировщик по умолчанию - Qt; AVIF, если его нет среди плагинов Qt, пишет Pillow
+EXPORT_FORMATS = {
+    'png': {
+        'name': "PNG",
+        'extensions': ('.png',),
+        'alpha': True,
+        'lossy': False,
+        'defaults': {'compress_level': 6},
+    },
+    'jpeg': {
+        'name': "JPEG",
+        'extensions': ('.jpg', '.jpeg'),
+        'alpha': False,
+        'lossy': True,
+        'defaults': {'quality': 90, 'progressive': True, 'optimize': True},
+    },
+    'webp': {
+        'name': "WebP",
+        'extensions': ('.webp',),
+        'alpha': True,
+        'lossy': True,
+        'defaults': {'quality': 85, 'lossless': False},
+    },
+    'avif': {
+        'name': "AVIF",
+        'extensions': ('.avif',),
+        'alpha': True,
+        'lossy': True,
+        'defaults': {'quality': 70, 'speed': 6},
+    },
+}
+
+class ExportEngine:
+    _available = None
+    
+    @staticmethod
+    def qt_formats():
+        return {bytes(name).decode().lower() for name in QImageWriter.supportedImageFormats()}
+    
+    @staticmethod
+    def pillow_supports(fmt):
+        try:
+            from PIL import features
+        except ImportError:
+            return False
+        return bool(features.check(fmt))
+    
+    @staticmethod
+    def available_formats():
+        if ExportEngine._available is None:
+            qt_formats = ExportEngine.qt_formats()
+            available = []
+            for fmt in EXPORT_FORMATS:
+                if fmt in qt_formats or (fmt == 'avif' and ExportEngine.pillow_supports('avif')):
+                    available.append(fmt)
+            ExportEngine._available = available
+        return ExportEngine._available
+    
+    @staticmethod
+    def format_for_path(path, default='png'):
+        extension = os.path.splitext(path)[1].lower()
+        for fmt, spec in EXPORT_FORMATS.items():
+            if extension in spec['extensions']:
+                return fmt
+        return default
+    
+    @staticmethod
+    def options_for(fmt, options=None):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Неизвестный формат: {fmt}")
+        merged = dict(EXPORT_FORMATS[fmt]['defaults'])
+        merged.update(options or {})
+        return merged
+    
+    @staticmethod
+    def is_lossy(fmt, options):
+        return EXPORT_FORMATS[fmt]['lossy'] and not options.get('lossless')
+    
+    @staticmethod
+    def flatten(image, background=Qt.GlobalColor.white):
+        # JPEG не хранит прозрачность: без подложки прозрачные пиксели становятся черными
+        if not image.hasAlphaChannel():
+            return image
+        result = QImage(image.size(), QImage.Format.Format_RGB32)
+        result.fill(background)
+        painter = QPainter(result)
+        painter.drawImage(0, 0, image)
+        painter.end()
+        return result
+    
+    @staticmethod
+    def encode(image, fmt, options=None):
+        options = ExportEngine.options_for(fmt, options)
+        if image.isNull():
+            raise ValueError("Пустое изображение")
+        if not EXPORT_FORMATS[fmt]['alpha']:
+            image = ExportEngine.flatten(image)
+        
+        if fmt == 'avif' and fmt not in ExportEngine.qt_formats():
+            return ExportEngine._encode_pillow(image, fmt, options)
+        return ExportEngine._encode_qt(image, fmt, options)
+    
+    @staticmethod
+    def _encode_qt(image, fmt, options):
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        writer = QImageWriter(buffer, fmt.encode())
+        
+        if fmt == 'png':
+            # Плагин PNG в Qt задает уровень zlib через качество: уровень = 9 - quality // 10
+            writer.setQuality((9 - max(0, min(9, int(options['compress_level'])))) * 10)
+        elif fmt == 'webp' and options.get('lossless'):
+            writer.setQuality(100)
+        elif 'quality' in options:
+            writer.setQuality(int(options['quality']))
+        
+        if fmt == 'jpeg':
+            writer.setProgressiveScanWrite(bool(options.get('progressive')))
+            writer.setOptimizedWrite(bool(options.get('optimize')))
+        
+        if not writer.write(image):
+            raise ValueError(f"Не удалось закодировать {EXPORT_FORMATS[fmt]['name']}: {writer.errorString()}")
+        return bytes(data)
+    
+    @staticmethod
+    def _encode_pillow(image, fmt, options):
+        from .image_bridge import ImageBridge
+        output = io.BytesIO()
+        params = {key: value for key, value in options.items() if key in ('quality', 'speed')}
+        ImageBridge.to_pil(image).save(output, fmt.upper(), **params)
+        return output.getvalue()
+    
+    @staticmethod
+    def encode_to_size(image, fmt, max_bytes, options=None, min_quality=EXPORT_MIN_QUALITY):
+        # Бинарный поиск наибольшего качества, при котором файл укладывается в max_bytes.
+        # Если не укладывается даже min_quality, возвращается самый маленький вариант
+        options = ExportEngine.options_for(fmt, options)
+        if not EXPORT_FORMATS[fmt]['alpha']:
+            image = ExportEngine.flatten(image)
+        data = ExportEngine.encode(image, fmt, options)
+        if len(data) <= max_bytes:
+            return data, options
+        
+        if not ExportEngine.is_lossy(fmt, options):
+            if fmt == 'png' and options['compress_level'] < 9:
+                options['compress_level'] = 9
+                data = ExportEngine.encode(image, fmt, options)
+            return data, options
+        
+        best = None
+        smallest = (data, options)
+        low, high = min_quality, int(options['quality']) - 1
+        while low <= high:
+            quality = (low + high) // 2
+            candidate_options = dict(options, quality=quality)
+            candidate = ExportEngine.encode(image, fmt, candidate_options)
+            if len(candidate) <= max_bytes:
+                best = (candidate, candidate_options)
+                low = quality + 1
+            else:
+                high = quality - 1
+                if len(candidate) < len(smallest[0]):
+                    smallest = (candidate, candidate_options)
+        return best or smallest
+    
+    @staticmethod
+    def save(image, path, fmt=None, options=None, max_bytes=None):
+        fmt = fmt or ExportEngine.format_for_path(path)
+        if max_bytes:
+            data, options = ExportEngine.encode_to_size(image, fmt, max_bytes, options)
+        else:
+            options = ExportEngine.options_for(fmt, options)
+            data = ExportEngine.encode(image, fmt, options)
+        
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        
+        return {
+            'path': path,
+            'format': fmt,
+            'width': image.width(),
+            'height': image.height(),
+            'bytes': len(data),
+            'quality': options.get('quality'),
+            'target_met': not max_bytes or len(data) <= max_bytes
+        }
+    
+    @staticmethod
+    def resize(image, max_dimension):
+        if not max_dimension or max(image.width(), image.height()) <= max_dimension:
+            return image
+        return image.scaled(QSize(max_dimension, max_dimension), Qt.AspectRatioMode.KeepAspectRatio,
+                            Qt.TransformationMode.SmoothTransformation)
+    
+    @staticmethod
+    def output_path(base_path, fmt, max_dimension=None):
+        root = os.path.splitext(base_path)[0]
+        suffix = f"_{max_dimension}" if max_dimension else ""
+        return root + suffix + EXPORT_FORMATS[fmt]['extensions'][0]
+    
+    @staticmethod
+    def save_output(image, path, fmt, max_dimension=None, options=None):
+        return ExportEngine.save(ExportEngine.resize(image, max_dimension), path, fmt, options)
+    
+    @staticmethod
+    def save_profile(image, base_path, outputs, max_workers=None):
+        # outputs - набор (формат, наибольшая сторона или None, качество или None).
+        # Мем уже отрисован один раз; уменьшение и кодирование каждого варианта идут параллельно
+        # (Qt отпускает GIL), поэтому общее время близко к самому медленному варианту
+        tasks = []
+        for fmt, max_dimension, quality in outputs:
+            options = {'quality': quality} if quality is not None else None
+            tasks.append((ExportEngine.output_path(base_path, fmt, max_dimension), fmt, max_dimension, options))
+        
+        paths = [task[0] for task in tasks]
+        if len(set(paths)) != len(paths):
+            raise ValueError("В профиле экспорта несколько выходов с одинаковым форматом и размером")
+        
+        # Самые крупные варианты запускаем первыми, чтобы они не ждали в очереди пула
+        order = sorted(range(len(tasks)), key=lambda i: -(tasks[i][2] or max(image.width(), image.height())))
+        workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {i: pool.submit(ExportEngine.save_output, image, *tasks[i]) for i in order}
+            return [futures[i].result() for i in range(len(tasks))]
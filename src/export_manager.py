@@ -1,28 +1,80 @@
 import os
 from datetime import datetime
-from PyQt6.QtWidgets import QFileDialog
+from PyQt6.QtWidgets import QFileDialog, QInputDialog
 from PyQt6.QtGui import QClipboard
+from .constants import EXPORT_PROFILES
+from .export_engine import ExportEngine, EXPORT_FORMATS
 
 class ExportManager:
     @staticmethod
-    def save_meme(pixmap, parent=None):
-        if pixmap.isNull():
-            return None
-        
-        file_path, _ = QFileDialog.getSaveFileName(
+    def file_filters():
+        filters = {}
+        for fmt in ExportEngine.available_formats():
+            spec = EXPORT_FORMATS[fmt]
+            patterns = " ".join(f"*{extension}" for extension in spec['extensions'])
+            filters[f"{spec['name']} Изображения ({patterns})"] = fmt
+        return filters
+    
+    @staticmethod
+    def choose_file(parent=None, default_name=None):
+        filters = ExportManager.file_filters()
+        file_path, selected_filter = QFileDialog.getSaveFileName(
             parent, "Сохранить мем",
-            f"meme_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            "PNG Images (*.png);;JPEG Images (*.jpg *.jpeg);;All Files (*)"
+            default_name or f"meme_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
+            ";;".join(list(filters) + ["Все файлы (*)"])
         )
+        if not file_path:
+            return None, None
+        
+        # Явно указанное расширение важнее выбранного фильтра
+        fmt = ExportEngine.format_for_path(file_path, None)
+        if fmt is None:
+            fmt = filters.get(selected_filter, 'png')
+            file_path += EXPORT_FORMATS[fmt]['extensions'][0]
+        return file_path, fmt
+    
+    @staticmethod
+    def save_meme(pixmap, parent=None, options=None, max_bytes=None):
+        if pixmap.isNull():
+            return None
         
+        file_path, fmt = ExportManager.choose_file(parent)
         if file_path:
-            quality = 90 if file_path.lower().endswith(('.jpg', '.jpeg')) else -1
-            
-            if pixmap.save(file_path, quality=quality):
-                return file_path
+            try:
+                ExportEngine.save(pixmap.toImage(), file_path, fmt, options, max_bytes)
+            except (OSError, ValueError):
+                return None
+            return file_path
         
         return None
     
+    @staticmethod
+    def profiles(extra=None):
+        # extra - пользовательские профили того же вида, например из настроек
+        profiles = dict(EXPORT_PROFILES)
+        for name, outputs in (extra or {}).items():
+            profiles[name] = tuple((fmt, max_dimension, quality) for fmt, max_dimension, quality in outputs)
+        return profiles
+    
+    @staticmethod
+    def choose_profile(parent=None, extra=None):
+        profiles = ExportManager.profiles(extra)
+        if len(profiles) == 1:
+            return next(iter(profiles.items()))
+        
+        labels = {f"{name} ({ExportManager.describe_profile(outputs)})": name for name, outputs in profiles.items()}
+        label, ok = QInputDialog.getItem(parent, "Профиль экспорта", "Профиль:", list(labels), 0, False)
+        if not ok:
+            return None, None
+        return labels[label], profiles[labels[label]]
+    
+    @staticmethod
+    def describe_profile(outputs):
+        return ", ".join(
+            f"{EXPORT_FORMATS[fmt]['name']} {max_dimension or 'оригинал'}"
+            for fmt, max_dimension, _ in outputs
+        )
+    
     @staticmethod
     def copy_to_clipboard(pixmap, parent=None):
         if not pixmap.isNull():
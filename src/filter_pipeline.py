@@ -0,0 +1,126 @@
+from .constants import RENDER_REFERENCE_SIZE
+from .filter_manager import FilterManager, BLUR_RADIUS
+
+POINT_FILTERS = {
+    "Контраст": ('contrast', 1.5),
+    "Яркость": ('brightness', 1.3),
+}
+
+class FilterPipeline:
+    def __init__(self, operations=None):
+        self.operations = []
+        for name, value in operations or []:
+            self.add(name, value)
+    
+    def add(self, name, value=None):
+        if name == 'filter' and value in POINT_FILTERS:
+            name, value = POINT_FILTERS[value]
+        
+        if name == 'filter' and value == "Нет":
+            return self
+        if name in ('brightness', 'contrast') and value == 1.0:
+            return self
+        
+        self.operations.append((name, value))
+        return self
+    
+    def is_identity(self):
+        return not self.operations
+    
+    def run(self, pixmap):
+        if pixmap.isNull() or self.is_identity():
+            return pixmap.copy()
+        
+        # PIL загружается только когда впервые нужен реальный фильтр
+        from .image_bridge import ImageBridge
+        try:
+            img = self.process(ImageBridge.pixmap_to_pil(pixmap))
+            return ImageBridge.pil_to_pixmap(img)
+        except:
+            return pixmap.copy()
+    
+    def apply(self, qimage):
+        if qimage.isNull() or self.is_identity():
+            return qimage
+        
+        from .image_bridge import ImageBridge
+        try:
+            return ImageBridge.to_qimage(self.process(ImageBridge.to_pil(qimage)))
+        except:
+            return qimage
+    
+    def process(self, img):
+        source_mode = img.mode
+        lut = None
+        
+        for name, value in self.operations:
+            if name == 'brightness':
+                lut = self._compose(lut, self._brightness_table(value))
+            elif name == 'contrast':
+                mean = self._mean_luminance(img, lut)
+                lut = self._compose(lut, self._contrast_table(value, mean))
+            elif value == "Черно-белый":
+                img = self._apply_lut(img, lut)
+                lut = None
+                img = img.convert("LA" if "A" in img.getbands() else "L")
+            elif value == "Сепия":
+                img = self._apply_lut(img, lut)
+                lut = None
+                img = FilterManager._apply_sepia(self._restore_mode(img, source_mode))
+            elif value == "Размытие":
+                img = self._apply_lut(img, lut)
+                lut = None
+                # Радиус задан для меньшей стороны RENDER_REFERENCE_SIZE, чтобы превью и файл размывались одинаково
+                img = FilterManager._apply_blur(img, BLUR_RADIUS * min(img.size) / RENDER_REFERENCE_SIZE)
+        
+        img = self._apply_lut(img, lut)
+        return self._restore_mode(img, source_mode)
+    
+    @staticmethod
+    def _brightness_table(factor):
+        return [min(255, int(i * factor)) for i in range(256)]
+    
+    @staticmethod
+    def _contrast_table(factor, mean):
+        return [max(0, min(255, int(mean + factor * (i - mean)))) for i in range(256)]
+    
+    @staticmethod
+    def _compose(lut, table):
+        if lut is None:
+            return table
+        return [table[v] for v in lut]
+    
+    @staticmethod
+    def _mean_luminance(img, lut):
+        histogram = img.histogram()
+        table = lut or list(range(256))
+        
+        means = []
+        for band in range(len(img.getbands())):
+            counts = histogram[band * 256:(band + 1) * 256]
+            total = sum(counts) or 1
+            means.append(sum(table[i] * c for i, c in enumerate(counts)) / total)
+        
+        if img.mode in ("L", "LA"):
+            mean = means[0]
+        else:
+            mean = means[0] * 0.299 + means[1] * 0.587 + means[2] * 0.114
+        
+        return int(mean + 0.5)
+    
+    @staticmethod
+    def _apply_lut(img, lut):
+        if lut is None:
+            return img
+        
+        if "A" in img.getbands():
+            color_bands = len(img.getbands()) - 1
+            return img.point(lut * color_bands + list(range(256)))
+        
+        return img.point(lut * len(img.getbands()))
+    
+    @staticmethod
+    def _restore_mode(img, mode):
+        if img.mode == mode:
+            return img
+        return img.convert("RGBA" if "A" in img.getbands() else "RGB")
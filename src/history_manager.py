@@ -0,0 +1,204 @@
+import time
+import zlib
+import hashlib
+from PyQt6.QtGui import QImage
+from .constants import UNDO_MAX_STEPS, UNDO_MEMORY_BYTES, UNDO_MERGE_MS, UNDO_TILE_SIZE
+
+# Изменения этих параметров, идущие подряд, склеиваются в один шаг (ползунок, набор текста)
+MERGEABLE = ('brightness', 'contrast', 'top_text', 'bottom_text')
+
+class TileStore:
+    def __init__(self, tile_size=UNDO_TILE_SIZE):
+        self.tile_size = tile_size
+        self.tiles = {}
+        self.bytes = 0
+    
+    @staticmethod
+    def encode(image, tile_size=UNDO_TILE_SIZE):
+        # Снимок режется на плитки, каждая сжимается zlib. Общее состояние не меняется, поэтому
+        # кодирование идет в фоновом потоке, а в хранилище плитки добавляет add(). Палитровые
+        # и не 32-битные форматы переводятся в 32 бита: restore не восстанавливает таблицу цветов
+        if image.depth() != 32 or image.colorCount():
+            if image.hasAlphaChannel():
+                image = image.convertToFormat(QImage.Format.Format_ARGB32)
+            else:
+                image = image.convertToFormat(QImage.Format.Format_RGB32)
+        width, height = image.width(), image.height()
+        stride = image.bytesPerLine()
+        pixel = image.depth() // 8
+        bits = image.constBits()
+        bits.setsize(image.sizeInBytes())
+        data = memoryview(bits)
+        
+        tiles = []
+        for top in range(0, height, tile_size):
+            rows = range(top, min(top + tile_size, height))
+            for left in range(0, width, tile_size):
+                start = left * pixel
+                end = min(left + tile_size, width) * pixel
+                raw = b"".join(data[row * stride + start:row * stride + end] for row in rows)
+                tiles.append((hashlib.blake2b(raw, digest_size=16).digest(), raw))
+        
+        # Одинаковые плитки сжимаются один раз
+        compressed = {}
+        for key, raw in tiles:
+            if key not in compressed:
+                compressed[key] = zlib.compress(raw, 1)
+        return {'width': width, 'height': height, 'format': image.format(), 'tile_size': tile_size,
+                'tiles': [(key, compressed[key]) for key, _ in tiles]}
+    
+    def add(self, encoded):
+        # Одинаковые плитки, в том числе из разных снимков, хранятся один раз
+        keys = []
+        for key, data in encoded['tiles']:
+            entry = self.tiles.get(key)
+            if entry is None:
+                entry = self.tiles[key] = [data, 0]
+                self.bytes += len(data)
+            entry[1] += 1
+            keys.append(key)
+        return dict(encoded, tiles=keys)
+    
+    def snapshot(self, image):
+        return self.add(TileStore.encode(image, self.tile_size))
+    
+    def restore(self, snapshot):
+        width, height = snapshot['width'], snapshot['height']
+        image = QImage(width, height, snapshot['format'])
+        stride = image.bytesPerLine()
+        pixel = image.depth() // 8
+        bits = image.bits()
+        bits.setsize(image.sizeInBytes())
+        data = memoryview(bits)
+        
+        tile_size = snapshot['tile_size']
+        keys = iter(snapshot['tiles'])
+        for top in range(0, height, tile_size):
+            rows = range(top, min(top + tile_size, height))
+            for left in range(0, width, tile_size):
+                start = left * pixel
+                row_bytes = (min(left + tile_size, width) - left) * pixel
+                raw = zlib.decompress(self.tiles[next(keys)][0])
+                for index, row in enumerate(rows):
+                    offset = row * stride + start
+                    data[offset:offset + row_bytes] = raw[index * row_bytes:(index + 1) * row_bytes]
+        return image
+    
+    def release(self, snapshot):
+        for key in snapshot['tiles']:
+            entry = self.tiles[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                self.bytes -= len(entry[0])
+                del self.tiles[key]
+
+class HistoryManager:
+    def __init__(self, max_bytes=UNDO_MEMORY_BYTES, max_steps=UNDO_MAX_STEPS, merge_ms=UNDO_MERGE_MS):
+        self.max_bytes = max_bytes
+        self.max_steps = max_steps
+        self.merge_ms = merge_ms
+        self.tiles = TileStore()
+        self.undo_stack = []
+        self.redo_stack = []
+        self.state = {}
+        self.command_bytes = 0
+    
+    def reset(self, state):
+        for command in self.undo_stack + self.redo_stack:
+            self._release(command)
+        self.undo_stack = []
+        self.redo_stack = []
+        self.state = dict(state)
+    
+    def can_undo(self):
+        return bool(self.undo_stack)
+    
+    def can_redo(self):
+        return bool(self.redo_stack)
+    
+    def memory_usage(self):
+        return self.tiles.bytes + self.command_bytes
+    
+    def record(self, state, snapshots=None):
+        # Команда хранит только изменившиеся параметры (до, после). Пиксели сохраняются лишь
+        # там, где параметров недостаточно: snapshots - {'before': QImage, 'after': QImage}
+        changes = {key: (self.state.get(key), value) for key, value in state.items() if self.state.get(key) != value}
+        if not changes:
+            return None
+        self.state = dict(state)
+        
+        branched = bool(self.redo_stack)
+        for command in self.redo_stack:
+            self._release(command)
+        self.redo_stack = []
+        
+        now = time.monotonic()
+        top = self.undo_stack[-1] if self.undo_stack else None
+        if (top is not None and not branched and not snapshots and not top['snapshots']
+                and set(changes) == set(top['changes']) and all(key in MERGEABLE for key in changes)
+                and (now - top['time']) * 1000 < self.merge_ms):
+            merged = {key: (top['changes'][key][0], after) for key, (_, after) in changes.items()}
+            self.undo_stack.pop()
+            self.command_bytes -= top['bytes']
+            if all(before == after for before, after in merged.values()):
+                return None
+            changes = merged
+        
+        command = {
+            'changes': changes,
+            'snapshots': {side: self.tiles.snapshot(image) for side, image in (snapshots or {}).items()
+                          if image is not None and not image.isNull()},
+            'time': now,
+            'bytes': len(repr(changes).encode('utf-8'))
+        }
+        self.command_bytes += command['bytes']
+        self.undo_stack.append(command)
+        self._evict()
+        return command
+    
+    def undo(self):
+        if not self.undo_stack:
+            return None
+        command = self.undo_stack.pop()
+        self.redo_stack.append(command)
+        values = {key: before for key, (before, _) in command['changes'].items()}
+        self.state.update(values)
+        return values, command['snapshots'].get('before')
+    
+    def redo(self):
+        if not self.redo_stack:
+            return None
+        command = self.redo_stack.pop()
+        self.undo_stack.append(command)
+        values = {key: after for key, (_, after) in command['changes'].items()}
+        self.state.update(values)
+        return values, command['snapshots'].get('after')
+    
+    def attach(self, command, side, encoded):
+        # Снимок, закодированный в фоне (TileStore.encode), добавляется к уже записанному шагу.
+        # Если шаг за это время вытеснен из истории, снимок не нужен
+        if command.get('released') or side in command['snapshots']:
+            return False
+        command['snapshots'][side] = self.tiles.add(encoded)
+        self._evict()
+        return True
+    
+    def restore_snapshot(self, snapshot):
+        return self.tiles.restore(snapshot)
+    
+    def _evict(self):
+        # Сначала вытесняются самые старые шаги отмены, затем самые дальние шаги повтора
+        while (len(self.undo_stack) + len(self.redo_stack) > self.max_steps
+               or self.memory_usage() > self.max_bytes):
+            if len(self.undo_stack) > 1:
+                self._release(self.undo_stack.pop(0))
+            elif self.redo_stack:
+                self._release(self.redo_stack.pop(0))
+            else:
+                break
+    
+    def _release(self, command):
+        command['released'] = True
+        self.command_bytes -= command['bytes']
+        for snapshot in command['snapshots'].values():
+            self.tiles.release(snapshot)
@@ -0,0 +1,88 @@
+import sys
+from PyQt6.QtGui import QImage, QPixmap
+from PIL import Image
+
+if sys.byteorder == "little":
+    ARGB32_RAWMODE = "BGRA"
+    ARGB32_PREMULTIPLIED_RAWMODE = "BGRa"
+    RGB32_RAWMODE = "BGRX"
+else:
+    ARGB32_RAWMODE = "ARGB"
+    ARGB32_PREMULTIPLIED_RAWMODE = "aRGB"
+    RGB32_RAWMODE = "XRGB"
+
+# (режим PIL, rawmode) для форматов QImage, которые читаются без конвертации в Qt.
+# RGBA8888 и Grayscale8 совпадают с внутренним форматом PIL и отображаются без копии.
+READ_FORMATS = {
+    QImage.Format.Format_RGBA8888: ("RGBA", "RGBA"),
+    QImage.Format.Format_Grayscale8: ("L", "L"),
+    QImage.Format.Format_ARGB32: ("RGBA", ARGB32_RAWMODE),
+    QImage.Format.Format_ARGB32_Premultiplied: ("RGBA", ARGB32_PREMULTIPLIED_RAWMODE),
+    QImage.Format.Format_RGB32: ("RGB", RGB32_RAWMODE),
+    QImage.Format.Format_RGBX8888: ("RGB", "RGBX"),
+    QImage.Format.Format_RGB888: ("RGB", "RGB"),
+}
+
+MAPPED_MODES = ("RGBA", "L")
+
+# Формат QImage и режим отображения PIL, в который копируется результат
+WRITE_FORMATS = {
+    "RGBA": (QImage.Format.Format_RGBA8888, "RGBA"),
+    "RGB": (QImage.Format.Format_RGBX8888, "RGBX"),
+    "L": (QImage.Format.Format_Grayscale8, "L"),
+}
+
+class ImageBridge:
+    @staticmethod
+    def to_pil(qimage):
+        if qimage.format() not in READ_FORMATS:
+            if qimage.hasAlphaChannel():
+                qimage = qimage.convertToFormat(QImage.Format.Format_ARGB32)
+            else:
+                qimage = qimage.convertToFormat(QImage.Format.Format_RGB32)
+        
+        mode, rawmode = READ_FORMATS[qimage.format()]
+        size = (qimage.width(), qimage.height())
+        
+        ptr = qimage.constBits()
+        ptr.setsize(qimage.sizeInBytes())
+        
+        img = Image.frombuffer(mode, size, ptr, "raw", rawmode, qimage.bytesPerLine(), 1)
+        
+        if mode == rawmode and mode in MAPPED_MODES:
+            # Изображение ссылается на память QImage, поэтому держим её до удаления img
+            img._qimage = qimage
+        
+        return img
+    
+    @staticmethod
+    def to_qimage(img):
+        if img.mode not in WRITE_FORMATS:
+            img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+        
+        qformat, view_mode = WRITE_FORMATS[img.mode]
+        qimage = QImage(img.width, img.height, qformat)
+        if qimage.isNull():
+            return qimage
+        
+        ptr = qimage.bits()
+        ptr.setsize(qimage.sizeInBytes())
+        
+        # Пиксели копируются один раз прямо в память, которой владеет QImage,
+        # с учетом выравнивания строк (bytesPerLine)
+        view = Image.frombuffer(view_mode, img.size, ptr, "raw", view_mode, qimage.bytesPerLine(), 1)
+        view.im.paste(img.im, (0, 0) + img.size)
+        if view_mode == "RGBX":
+            # В RGB-режиме PIL четвертый байт - мусор, а Qt ждет в X-канале 0xFF:
+            # иначе при переводе в ARGB32 изображение становится прозрачным
+            view.im.fillband(3, 255)
+        
+        return qimage
+    
+    @staticmethod
+    def pixmap_to_pil(pixmap):
+        return ImageBridge.to_pil(pixmap.toImage())
+    
+    @staticmethod
+    def pil_to_pixmap(img):
+        return QPixmap.fromImage(ImageBridge.to_qimage(img))
@@ -1,9 +1,87 @@
-from PyQt6.QtGui import QPixmap
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPixmap, QImageReader, QImageIOHandler
 
 class ImageProcessor:
     @staticmethod
     def load_image(path):
-        pixmap = QPixmap(path)
-        if pixmap.isNull():
+        image = ImageProcessor.read_image(path)
+        if image.isNull():
             return QPixmap()
-        return pixmap
+        return QPixmap.fromImage(image)
+    
+    @staticmethod
+    def read_image(path, max_size=None):
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        
+        if max_size is not None:
+            size = reader.size()
+            if size.isValid():
+                # scaledSize задается для кадра до поворота по EXIF
+                if reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90:
+                    max_size = max_size.transposed()
+                if size.width() > max_size.width() or size.height() > max_size.height():
+                    # JPEG при этом декодируется сразу в уменьшенном масштабе (DCT scaling)
+                    reader.setScaledSize(size.scaled(max_size, Qt.AspectRatioMode.KeepAspectRatio))
+        
+        return reader.read()
+    
+    @staticmethod
+    def image_size(path):
+        reader = QImageReader(path)
+        size = reader.size()
+        if size.isValid() and reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90:
+            size = size.transposed()
+        return size
+
+class SourceImage:
+    def __init__(self, path):
+        self.path = path
+        self.full_size = ImageProcessor.image_size(path)
+    
+    def isNull(self):
+        return not self.full_size.isValid() or self.full_size.isEmpty()
+    
+    def size(self):
+        return self.full_size
+    
+    def width(self):
+        return self.full_size.width()
+    
+    def height(self):
+        return self.full_size.height()
+    
+    def full(self):
+        # Полное декодирование - только на время сохранения/копирования в потоке экспорта.
+        # Результат не кэшируется, чтобы картинка в полном разрешении не оставалась в памяти
+        return ImageProcessor.read_image(self.path)
+    
+    def preview(self, max_size):
+        return ImageProcessor.read_image(self.path, max_size)
+
+class MemoryImage:
+    # Источник без файла на диске (например, восстановленный из снимка истории правок)
+    def __init__(self, image):
+        self.path = None
+        self.image = image
+    
+    def isNull(self):
+        return self.image.isNull()
+    
+    def size(self):
+        return self.image.size()
+    
+    def width(self):
+        return self.image.width()
+    
+    def height(self):
+        return self.image.height()
+    
+    def full(self):
+        return self.image
+    
+    def preview(self, max_size):
+        if self.image.width() <= max_size.width() and self.image.height() <= max_size.height():
+            return self.image
+        return self.image.scaled(max_size, Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
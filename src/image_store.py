@@ -0,0 +1,60 @@
+import os
+import hashlib
+from .constants import FINGERPRINT_SAMPLE_SIZE
+
+class ImageStore:
+    def __init__(self, db):
+        self.db = db
+    
+    @staticmethod
+    def fingerprint(path):
+        # Хеш по выборке (начало, середина, конец) и размеру: не читаем файл целиком
+        stat = os.stat(path)
+        size = stat.st_size
+        digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+        
+        with open(path, 'rb') as f:
+            if size <= FINGERPRINT_SAMPLE_SIZE * 3:
+                digest.update(f.read())
+            else:
+                for offset in (0, (size - FINGERPRINT_SAMPLE_SIZE) // 2, size - FINGERPRINT_SAMPLE_SIZE):
+                    f.seek(offset)
+                    digest.update(f.read(FINGERPRINT_SAMPLE_SIZE))
+        
+        return digest.hexdigest(), size, stat.st_mtime_ns
+    
+    def register(self, path, width, height):
+        content_hash, size, mtime_ns = ImageStore.fingerprint(path)
+        return self.db.store_image(path, width, height, content_hash, size, mtime_ns)
+    
+    def resolve(self, path):
+        # Тот же путь, размер и mtime - файл не менялся, читать его не нужно.
+        # Иначе считаем выборочный хеш и ищем то же содержимое (копия, перенос, touch)
+        stat = os.stat(path)
+        row = self.db.find_image(path, stat.st_size, stat.st_mtime_ns)
+        if row is not None:
+            self.db.touch_image(row[0])
+            return row[0], None
+        
+        fingerprint = ImageStore.fingerprint(path)
+        row = self.db.find_image_by_content(fingerprint[0], fingerprint[1])
+        if row is not None:
+            return self.db.store_image(path, row[1], row[2], *fingerprint), None
+        return None, fingerprint
+    
+    def load(self, path, decoder):
+        # Изображение всегда открывается по запрошенному пути: найденная по содержимому запись
+        # могла принадлежать файлу, который уже переименован или удален. decoder читает
+        # только заголовок, поэтому кэшировать сами объекты незачем
+        try:
+            image_id, fingerprint = self.resolve(path)
+        except OSError:
+            return None, decoder(path)
+        
+        image = decoder(path)
+        if image.isNull():
+            return None, image
+        
+        if image_id is None:
+            image_id = self.db.store_image(path, image.width(), image.height(), *fingerprint)
+        return image_id, image
@@ -1,38 +1,62 @@
 import sys
 import os
 import random
+import json
 from datetime import datetime
 from PyQt6.QtWidgets import *
 from PyQt6.QtGui import *
 from PyQt6.QtCore import *
 from .constants import *
-from .database import Database
-from .image_processor import ImageProcessor
-from .text_manager import TextManager
+from .database import Database, MEME_TABLES
+from .image_processor import SourceImage, MemoryImage
+from .image_store import ImageStore
+from .thumbnail_cache import ThumbnailCache, ThumbnailLoader
 from .meme_renderer import MemeRenderer
+from .render_spec import RenderSpec
 from .export_manager import ExportManager
-from .filter_manager import FilterManager
+from .export_engine import ExportEngine
+from .filter_pipeline import FilterPipeline
+from .render_worker import RenderWorker
+from .preview_scheduler import PreviewScheduler
+from .history_manager import HistoryManager, TileStore
 from .random_meme_generator import RandomMemeGenerator
-from .statistics_dialog import StatisticsDialog
-from .text_style_dialog import TextStyleDialog
 
 class MemeGeneratorPro(QMainWindow):
+    # (путь файла, ошибка или None) - запись мема в базу завершилась в потоке записи
+    meme_recorded = pyqtSignal(object, object)
+    
     def __init__(self):
         super().__init__()
         self.db = Database()
+        self.image_store = ImageStore(self.db)
+        self.thumbnail_cache = ThumbnailCache(os.path.join(os.path.dirname(self.db.path) or ".", "thumbnails"))
+        self.thumbnail_loader = ThumbnailLoader(self.thumbnail_cache, parent=self)
         self.export_manager = ExportManager()
         self.current_image_id = None
         self.current_meme_id = None
-        self.original_pixmap = None
-        self.current_pixmap = None
+        self.original_image = None
+        self.preview_image = None
         self.text_edit_visible = None
         self.displayed_pixmap = None
+        self.render_worker = RenderWorker(parent=self)
+        self.export_worker = RenderWorker(latest_only=False, parent=self)
+        self.load_worker = RenderWorker(parent=self)
+        self.history_worker = RenderWorker(latest_only=False, parent=self)
+        self.loading_path = None
+        self.preview_renderer = MemeRenderer()
+        # Основа в полном разрешении не кэшируется: каждый экспорт заново декодирует исходник
+        self.export_renderer = MemeRenderer(max_base_layers=0)
+        self.text_style_dialog = None
+        self.statistics_dialog = None
+        self.history = HistoryManager()
+        self.image_identity = None
+        self.replaced_preview = None
         
         self.top_text_style = {
             'font': 'Impact',
             'size': 48,
-            'color': QColor(255, 255, 255),
-            'outline_color': QColor(0, 0, 0),
+            'color': QColor(DEFAULT_TEXT_COLOR),
+            'outline_color': QColor(DEFAULT_OUTLINE_COLOR),
             'has_outline': True,
             'has_shadow': False,
             'has_gradient': False,
@@ -42,8 +66,8 @@ class MemeGeneratorPro(QMainWindow):
         self.bottom_text_style = {
             'font': 'Impact',
             'size': 48,
-            'color': QColor(255, 255, 255),
-            'outline_color': QColor(0, 0, 0),
+            'color': QColor(DEFAULT_TEXT_COLOR),
+            'outline_color': QColor(DEFAULT_OUTLINE_COLOR),
             'has_outline': True,
             'has_shadow': False,
             'has_gradient': False,
@@ -147,6 +171,13 @@ class MemeGeneratorPro(QMainWindow):
         self.save_btn.setEnabled(False)
         file_layout.addWidget(self.save_btn)
         
+        self.profile_btn = QPushButton("📦 Экспорт по профилю (Ctrl+Shift+S)")
+        self.profile_btn.setStyleSheet(BUTTON_STYLE)
+        self.profile_btn.clicked.connect(self.export_profile)
+        self.profile_btn.setShortcut("Ctrl+Shift+S")
+        self.profile_btn.setEnabled(False)
+        file_layout.addWidget(self.profile_btn)
+        
         self.copy_btn = QPushButton("📋 Копировать в буфер (Ctrl+C)")
         self.copy_btn.setStyleSheet(BUTTON_STYLE)
         self.copy_btn.clicked.connect(self.copy_to_clipboard)
@@ -227,6 +258,25 @@ class MemeGeneratorPro(QMainWindow):
         tools_layout = QVBoxLayout()
         tools_layout.setSpacing(5)
         
+        undo_layout = QHBoxLayout()
+        undo_layout.setSpacing(5)
+        
+        self.undo_btn = QPushButton("↩️ Отменить")
+        self.undo_btn.setStyleSheet(BUTTON_STYLE)
+        self.undo_btn.clicked.connect(self.undo)
+        self.undo_btn.setShortcut("Ctrl+Z")
+        self.undo_btn.setEnabled(False)
+        undo_layout.addWidget(self.undo_btn)
+        
+        self.redo_btn = QPushButton("↪️ Повторить")
+        self.redo_btn.setStyleSheet(BUTTON_STYLE)
+        self.redo_btn.clicked.connect(self.redo)
+        self.redo_btn.setShortcut("Ctrl+Y")
+        self.redo_btn.setEnabled(False)
+        undo_layout.addWidget(self.redo_btn)
+        
+        tools_layout.addLayout(undo_layout)
+        
         self.random_btn = QPushButton("🎲 Случайный мем (Ctrl+R)")
         self.random_btn.setStyleSheet(BUTTON_STYLE)
         self.random_btn.clicked.connect(self.generate_random_meme)
@@ -341,7 +391,7 @@ class MemeGeneratorPro(QMainWindow):
         self.top_text_edit = QTextEdit()
         self.top_text_edit.setMaximumHeight(50)
         self.top_text_edit.setPlaceholderText("Введите верхний текст...")
-        self.top_text_edit.textChanged.connect(self.update_preview)
+        self.top_text_edit.textChanged.connect(lambda: self.preview_scheduler.schedule(PreviewScheduler.TEXT))
         self.top_text_edit.setStyleSheet("""
             QTextEdit {
                 background-color: rgba(10, 10, 26, 0.9);
@@ -357,7 +407,7 @@ class MemeGeneratorPro(QMainWindow):
         self.bottom_text_edit = QTextEdit()
         self.bottom_text_edit.setMaximumHeight(50)
         self.bottom_text_edit.setPlaceholderText("Введите нижний текст...")
-        self.bottom_text_edit.textChanged.connect(self.update_preview)
+        self.bottom_text_edit.textChanged.connect(lambda: self.preview_scheduler.schedule(PreviewScheduler.TEXT))
         self.bottom_text_edit.setStyleSheet("""
             QTextEdit {
                 background-color: rgba(10, 10, 26, 0.9);
@@ -382,7 +432,11 @@ class MemeGeneratorPro(QMainWindow):
         
         self.preview_timer = QTimer()
         self.preview_timer.setSingleShot(True)
-        self.preview_timer.timeout.connect(self.update_preview)
+        self.preview_scheduler = PreviewScheduler(
+            self.preview_timer, self.render_dirty_stages,
+            self.preview_interval(), self
+        )
+        self.meme_recorded.connect(self.on_meme_recorded)
         
         self.load_recent_images()
     
@@ -392,24 +446,114 @@ class MemeGeneratorPro(QMainWindow):
             "Изображения (*.png *.jpg *.jpeg *.bmp *.gif *.webp);;Все файлы (*)"
         )
         if file_path:
-            self.original_pixmap = ImageProcessor.load_image(file_path)
-            if not self.original_pixmap.isNull():
-                self.current_pixmap = self.original_pixmap.copy()
-                self.displayed_pixmap = None
-                self.update_preview()
-                self.save_btn.setEnabled(True)
-                self.current_image_id = self.db.save_image(
-                    file_path, 
-                    self.original_pixmap.width(),
-                    self.original_pixmap.height()
-                )
-                self.db.save_setting('last_image_path', file_path)
-                self.filter_combo.setCurrentIndex(0)
-                self.brightness_slider.setValue(100)
-                self.contrast_slider.setValue(100)
-                self.text_input_panel.hide()
-            else:
+            self.open_image(file_path, self.on_image_opened)
+    
+    def open_image(self, file_path, on_loaded=None, show_errors=True):
+        # Повторно открытый файл (или его копия) получает прежний images.id без новой записи в базе.
+        # Здесь читается только заголовок, превью декодируется в фоне
+        image_id, source = self.image_store.load(file_path, self.decode_image)
+        if source.isNull():
+            if show_errors:
                 QMessageBox.warning(self, "Ошибка", "Не удалось загрузить изображение")
+            return
+        
+        # Новый файл вытесняет еще не загруженный: прежнее превью не декодируется, если его
+        # загрузка еще не началась, а результат уже начатой отбрасывается
+        self.loading_path = file_path
+        self.show_loading_placeholder(file_path)
+        self.load_worker.submit(
+            self.preview_proxy_job(source),
+            lambda preview: self.on_image_loaded(file_path, image_id, source, preview, on_loaded, show_errors),
+            lambda error: self.on_image_load_failed(error, show_errors)
+        )
+    
+    def on_image_loaded(self, file_path, image_id, source, preview, on_loaded, show_errors):
+        if preview.isNull():
+            self.on_image_load_failed("", show_errors)
+            return
+        
+        self.loading_path = None
+        self.replaced_preview = self.preview_image
+        self.image_identity = MemeGeneratorPro.file_identity(file_path)
+        self.original_image = source
+        self.preview_image = preview
+        self.current_image_id = image_id
+        self.displayed_pixmap = None
+        self.preview_scheduler.schedule(PreviewScheduler.FILTER)
+        self.save_btn.setEnabled(True)
+        self.profile_btn.setEnabled(True)
+        if on_loaded:
+            on_loaded(file_path)
+    
+    def on_image_load_failed(self, error, show_errors=True):
+        self.loading_path = None
+        self.preview_scheduler.schedule(PreviewScheduler.FILTER)
+        if show_errors:
+            QMessageBox.warning(self, "Ошибка", "Не удалось загрузить изображение")
+    
+    def on_image_opened(self, file_path):
+        self.db.save_setting('last_image_path', file_path)
+        self.thumbnail_loader.request(file_path)
+        self.filter_combo.setCurrentIndex(0)
+        self.brightness_slider.setValue(100)
+        self.contrast_slider.setValue(100)
+        self.text_input_panel.hide()
+    
+    def show_loading_placeholder(self, file_path):
+        self.image_label.clear()
+        self.image_label.setMinimumSize(QSize(0, 0))
+        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.image_label.setText(f"⏳ Загрузка изображения...\n{os.path.basename(file_path)}")
+        self.image_label.setFont(QFont("Arial", 16, QFont.Weight.Bold))
+        self.image_label.setStyleSheet("""
+            QLabel {
+                background-color: #0A0A1A;
+                color: #8A2BE2;
+                font-weight: bold;
+                padding: 50px;
+            }
+        """)
+    
+    def decode_image(self, path):
+        # Читается только заголовок; пиксели декодируются позже: превью - в уменьшенном масштабе,
+        # полное разрешение - при сохранении или копировании
+        return SourceImage(path)
+    
+    def preview_proxy_job(self, source):
+        viewport_size = self.image_scroll.viewport().size()
+        max_width = int(viewport_size.width() * PREVIEW_HEADROOM)
+        max_height = int(viewport_size.height() * PREVIEW_HEADROOM)
+        max_size = QSize(max(1, max_width), max(1, max_height))
+        
+        return lambda: source.preview(max_size)
+    
+    def on_proxy_rebuilt(self, source, preview):
+        if source is self.original_image and not preview.isNull():
+            self.preview_image = preview
+            self.preview_scheduler.schedule(PreviewScheduler.FILTER)
+    
+    def current_pipeline(self):
+        return FilterPipeline([
+            ('filter', self.filter_combo.currentText()),
+            ('brightness', self.brightness_slider.value() / 100.0),
+            ('contrast', self.contrast_slider.value() / 100.0)
+        ])
+    
+    def current_spec(self):
+        return RenderSpec(self.current_pipeline(), self.collect_captions())
+    
+    def collect_captions(self):
+        captions = []
+        
+        top_text = self.top_text_edit.toPlainText().strip()
+        if top_text:
+            captions.append({'position': 'top', 'text': top_text, 'style': dict(self.top_text_style)})
+        
+        bottom_text = self.bottom_text_edit.toPlainText().strip()
+        if bottom_text:
+            captions.append({'position': 'bottom', 'text': bottom_text, 'style': dict(self.bottom_text_style)})
+        
+        return captions
     
     def show_text_input(self, position):
         self.text_input_panel.show()
@@ -426,8 +570,23 @@ class MemeGeneratorPro(QMainWindow):
             self.bottom_text_edit.setFocus()
             self.text_input_label.setText("Редактирование НИЖНЕГО текста:")
     
+    def get_text_style_dialog(self):
+        # Диалог (и список шрифтов в QFontComboBox) строится при первом открытии и переиспользуется
+        if self.text_style_dialog is None:
+            from .text_style_dialog import TextStyleDialog
+            self.text_style_dialog = TextStyleDialog(self)
+        return self.text_style_dialog
+    
+    def get_statistics_dialog(self):
+        if self.statistics_dialog is None:
+            from .statistics_dialog import StatisticsDialog
+            self.statistics_dialog = StatisticsDialog(self.db, self)
+        else:
+            self.statistics_dialog.load_data()
+        return self.statistics_dialog
+    
     def open_text_style_dialog(self):
-        dialog = TextStyleDialog(self)
+        dialog = self.get_text_style_dialog()
         dialog.font_combo.setCurrentFont(QFont(self.top_text_style['font']))
         dialog.size_spin.setValue(self.top_text_style['size'])
         dialog.text_color = self.top_text_style['color']
@@ -461,64 +620,142 @@ class MemeGeneratorPro(QMainWindow):
                 self.top_text_style['gradient_type'] = "Конический"
             
             self.bottom_text_style.update(self.top_text_style)
+            self.preview_scheduler.schedule(PreviewScheduler.TEXT)
+    
+    def render_dirty_stages(self, stages):
+        if PreviewScheduler.FILTER in stages or PreviewScheduler.TEXT in stages:
+            self.record_history()
             self.update_preview()
+        elif self.displayed_pixmap and not self.displayed_pixmap.isNull():
+            self.show_pixmap(self.displayed_pixmap)
+    
+    @staticmethod
+    def file_identity(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return (path, None, None)
+        return (path, stat.st_size, stat.st_mtime_ns)
+    
+    @staticmethod
+    def style_state(style):
+        return dict(style, color=style['color'].name(QColor.NameFormat.HexArgb),
+                    outline_color=style['outline_color'].name(QColor.NameFormat.HexArgb))
+    
+    @staticmethod
+    def style_from_state(state):
+        return dict(state, color=QColor(state['color']), outline_color=QColor(state['outline_color']))
+    
+    def editor_state(self):
+        return {
+            'image': self.image_identity,
+            'filter': self.filter_combo.currentText(),
+            'brightness': self.brightness_slider.value(),
+            'contrast': self.contrast_slider.value(),
+            'top_text': self.top_text_edit.toPlainText(),
+            'bottom_text': self.bottom_text_edit.toPlainText(),
+            'top_style': MemeGeneratorPro.style_state(self.top_text_style),
+            'bottom_style': MemeGeneratorPro.style_state(self.bottom_text_style)
+        }
+    
+    def record_history(self):
+        # Вызывается на каждом такте планировщика превью: шаг истории - разница параметров
+        # с предыдущим состоянием. Пиксели нужны только при смене изображения
+        if self.loading_path or self.image_identity is None:
+            return
+        
+        state = self.editor_state()
+        replaced_preview, self.replaced_preview = self.replaced_preview, None
+        if self.history.state.get('image') is None:
+            self.history.reset(state)
+        elif state['image'] != self.history.state['image']:
+            # Файл, который можно перечитать с диска, при отмене просто открывается снова.
+            # Снимок нужен только изображению без такого файла, и сжимается он в фоне
+            images = {'before': (self.history.state['image'], replaced_preview),
+                      'after': (state['image'], self.preview_image)}
+            command = self.history.record(state)
+            for side, (identity, image) in images.items():
+                if command is not None and image is not None and not MemeGeneratorPro.is_readable(identity):
+                    self.snapshot_in_background(command, side, image)
+        else:
+            self.history.record(state)
+        self.update_history_buttons()
+    
+    def snapshot_in_background(self, command, side, image):
+        self.history_worker.submit(
+            lambda: TileStore.encode(image),
+            lambda encoded: self.history.attach(command, side, encoded)
+        )
+    
+    def update_history_buttons(self):
+        self.undo_btn.setEnabled(self.history.can_undo())
+        self.redo_btn.setEnabled(self.history.can_redo())
+    
+    def undo(self):
+        if not self.loading_path:
+            self.apply_history_step(self.history.undo())
+    
+    def redo(self):
+        if not self.loading_path:
+            self.apply_history_step(self.history.redo())
+    
+    def apply_history_step(self, step):
+        # history.state уже обновлено, поэтому изменения виджетов ниже не записываются как новый шаг
+        if step is None:
+            return
+        values, snapshot = step
+        
+        if 'image' in values:
+            self.restore_image(values['image'], snapshot)
+        if 'filter' in values:
+            self.filter_combo.setCurrentText(values['filter'])
+        if 'brightness' in values:
+            self.brightness_slider.setValue(values['brightness'])
+        if 'contrast' in values:
+            self.contrast_slider.setValue(values['contrast'])
+        if 'top_text' in values:
+            self.top_text_edit.setPlainText(values['top_text'])
+        if 'bottom_text' in values:
+            self.bottom_text_edit.setPlainText(values['bottom_text'])
+        if 'top_style' in values:
+            self.top_text_style = MemeGeneratorPro.style_from_state(values['top_style'])
+        if 'bottom_style' in values:
+            self.bottom_text_style = MemeGeneratorPro.style_from_state(values['bottom_style'])
+        
+        self.preview_scheduler.schedule(PreviewScheduler.FILTER, PreviewScheduler.TEXT)
+        self.update_history_buttons()
+    
+    @staticmethod
+    def is_readable(identity):
+        return identity is not None and identity[1] is not None and identity == MemeGeneratorPro.file_identity(identity[0])
+    
+    def restore_image(self, identity, snapshot):
+        # Файл не изменился - просто открываем его снова. Иначе восстанавливаем снимок из плиток
+        if MemeGeneratorPro.is_readable(identity):
+            self.open_image(identity[0], show_errors=False)
+            return
+        if snapshot is None:
+            return
+        
+        image = self.history.restore_snapshot(snapshot)
+        self.original_image = MemoryImage(image)
+        self.preview_image = image
+        self.current_image_id = None
+        self.image_identity = identity
+        self.displayed_pixmap = None
     
     def update_preview(self):
-        if self.current_pixmap and not self.current_pixmap.isNull():
-            pixmap = self.current_pixmap.copy()
-            
-            top_text = self.top_text_edit.toPlainText().strip()
-            bottom_text = self.bottom_text_edit.toPlainText().strip()
-            
-            if top_text or bottom_text:
-                painter = QPainter(pixmap)
-                painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-                painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
-                painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
-                
-                if top_text:
-                    base_size = self.top_text_style['size']
-                    scaled_size = int(base_size * (min(pixmap.width(), pixmap.height()) / 800))
-                    scaled_size = max(20, min(scaled_size, 100))
-                    
-                    rect = QRect(20, 20, pixmap.width() - 40, pixmap.height() // 3)
-                    TextManager.draw_text(
-                        painter, rect, top_text,
-                        Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter,
-                        self.top_text_style['font'],
-                        scaled_size,
-                        self.top_text_style['color'],
-                        self.top_text_style['outline_color'],
-                        self.top_text_style['has_outline'],
-                        self.top_text_style['has_shadow'],
-                        self.top_text_style['gradient_type'] if self.top_text_style['has_gradient'] else None
-                    )
-                
-                if bottom_text:
-                    base_size = self.bottom_text_style['size']
-                    scaled_size = int(base_size * (min(pixmap.width(), pixmap.height()) / 800))
-                    scaled_size = max(20, min(scaled_size, 100))
-                    
-                    rect = QRect(20, pixmap.height() * 2 // 3, 
-                               pixmap.width() - 40, pixmap.height() // 3 - 20)
-                    TextManager.draw_text(
-                        painter, rect, bottom_text,
-                        Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignHCenter,
-                        self.bottom_text_style['font'],
-                        scaled_size,
-                        self.bottom_text_style['color'],
-                        self.bottom_text_style['outline_color'],
-                        self.bottom_text_style['has_outline'],
-                        self.bottom_text_style['has_shadow'],
-                        self.bottom_text_style['gradient_type'] if self.bottom_text_style['has_gradient'] else None
-                    )
-                
-                painter.end()
+        if self.preview_image and not self.preview_image.isNull():
+            renderer = self.preview_renderer
+            source = self.preview_image
+            spec = self.current_spec()
             
-            self.displayed_pixmap = pixmap
-            self.show_pixmap(pixmap)
-        elif self.original_pixmap:
-            self.show_pixmap(self.original_pixmap)
+            self.render_worker.submit(
+                lambda: renderer.render(source, spec),
+                self.on_preview_rendered
+            )
+        elif self.loading_path:
+            return
         else:
             self.image_label.setText("Загрузите изображение\n(Поддерживаются форматы: PNG, JPG, JPEG, BMP, GIF, WEBP)")
             self.image_label.setFont(QFont("Arial", 16, QFont.Weight.Bold))
@@ -531,6 +768,10 @@ class MemeGeneratorPro(QMainWindow):
                 }
             """)
     
+    def on_preview_rendered(self, image):
+        self.displayed_pixmap = QPixmap.fromImage(image)
+        self.show_pixmap(self.displayed_pixmap)
+    
     def show_pixmap(self, pixmap):
         if pixmap.isNull():
             return
@@ -559,120 +800,169 @@ class MemeGeneratorPro(QMainWindow):
         self.image_label.update()
     
     def apply_filter(self, filter_name):
-        if self.original_pixmap:
-            filtered = FilterManager.apply_filter(self.original_pixmap, filter_name)
-            
-            brightness_factor = self.brightness_slider.value() / 100.0
-            if brightness_factor != 1.0:
-                filtered = FilterManager.adjust_brightness(filtered, brightness_factor)
-            
-            contrast_factor = self.contrast_slider.value() / 100.0
-            if contrast_factor != 1.0:
-                filtered = FilterManager.adjust_contrast(filtered, contrast_factor)
-            
-            self.current_pixmap = filtered
-            self.update_preview()
+        if self.preview_image:
+            self.preview_scheduler.schedule(PreviewScheduler.FILTER)
     
     def adjust_brightness(self, value):
-        if self.original_pixmap:
+        if self.original_image:
             self.apply_filter(self.filter_combo.currentText())
     
     def adjust_contrast(self, value):
-        if self.original_pixmap:
+        if self.original_image:
             self.apply_filter(self.filter_combo.currentText())
     
     def reset_filters(self):
         self.filter_combo.setCurrentIndex(0)
         self.brightness_slider.setValue(100)
         self.contrast_slider.setValue(100)
-        if self.original_pixmap:
-            self.current_pixmap = self.original_pixmap.copy()
-            self.update_preview()
+        if self.preview_image:
+            self.preview_scheduler.schedule(PreviewScheduler.FILTER)
+    
+    def full_resolution_job(self):
+        renderer = self.export_renderer
+        source = self.original_image
+        spec = self.current_spec()
+        return lambda: renderer.render(source.full(), spec)
     
     def save_meme(self):
-        if not self.current_pixmap or self.current_pixmap.isNull():
+        if not self.original_image or self.original_image.isNull():
             return
-            
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Сохранить мем", "my_meme.png",
-            "PNG Изображения (*.png);;JPEG Изображения (*.jpg *.jpeg);;Все файлы (*)"
-        )
+        
+        file_path, fmt = ExportManager.choose_file(self, "my_meme.png")
         
         if file_path:
-            pixmap = self.current_pixmap.copy()
-            
-            top_text = self.top_text_edit.toPlainText().strip()
-            bottom_text = self.bottom_text_edit.toPlainText().strip()
+            render = self.full_resolution_job()
+            options, max_bytes = self.export_settings(fmt)
+            meme_data = self.collect_meme_data(file_path)
             
-            if top_text or bottom_text:
-                painter = QPainter(pixmap)
-                painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-                painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
-                
-                if top_text:
-                    rect = QRect(20, 20, pixmap.width() - 40, pixmap.height() // 3)
-                    TextManager.draw_text(
-                        painter, rect, top_text,
-                        Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter,
-                        self.top_text_style['font'],
-                        self.top_text_style['size'],
-                        self.top_text_style['color'],
-                        self.top_text_style['outline_color'],
-                        self.top_text_style['has_outline'],
-                        self.top_text_style['has_shadow'],
-                        self.top_text_style['gradient_type'] if self.top_text_style['has_gradient'] else None
-                    )
-                
-                if bottom_text:
-                    rect = QRect(20, pixmap.height() * 2 // 3, 
-                               pixmap.width() - 40, pixmap.height() // 3 - 20)
-                    TextManager.draw_text(
-                        painter, rect, bottom_text,
-                        Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignHCenter,
-                        self.bottom_text_style['font'],
-                        self.bottom_text_style['size'],
-                        self.bottom_text_style['color'],
-                        self.bottom_text_style['outline_color'],
-                        self.bottom_text_style['has_outline'],
-                        self.bottom_text_style['has_shadow'],
-                        self.bottom_text_style['gradient_type'] if self.bottom_text_style['has_gradient'] else None
-                    )
-                
-                painter.end()
-            
-            if pixmap.save(file_path):
-                self.current_meme_id = self.db.save_meme(
-                    self.current_image_id,
-                    self.top_text_edit.toPlainText(),
-                    self.bottom_text_edit.toPlainText(),
-                    self.top_text_style['size'],
-                    self.top_text_style['color'].name(),
-                    self.top_text_style['outline_color'].name(),
-                    self.top_text_style['has_outline'],
-                    self.top_text_style['has_shadow'],
-                    file_path
-                )
-                
-                self.db.increment_downloads(self.current_meme_id)
-                QMessageBox.information(self, "Успех", "Мем успешно сохранен!")
-            else:
-                QMessageBox.warning(self, "Ошибка", "Не удалось сохранить файл")
+            # Рендер и кодирование (включая подбор качества под лимит размера) идут в потоке экспорта
+            self.export_worker.submit(
+                lambda: ExportEngine.save(render(), file_path, fmt, options, max_bytes),
+                lambda result: self.on_meme_saved(result, meme_data),
+                self.on_meme_save_failed
+            )
+    
+    def export_profile(self):
+        if not self.original_image or self.original_image.isNull():
+            return
+        
+        try:
+            name, outputs = ExportManager.choose_profile(self, json.loads(self.db.get_setting('export_profiles', '{}')))
+        except (ValueError, TypeError, AttributeError):
+            name, outputs = ExportManager.choose_profile(self)
+        if not outputs:
+            return
+        
+        base_path, _ = ExportManager.choose_file(self, "my_meme.png")
+        if not base_path:
+            return
+        
+        # Мем отрисовывается один раз, все варианты профиля кодируются параллельно
+        # и записываются к одному memes.id
+        render = self.full_resolution_job()
+        meme_data = self.collect_meme_data(ExportEngine.output_path(base_path, outputs[0][0], outputs[0][1]))
+        self.export_worker.submit(
+            lambda: ExportEngine.save_profile(render(), base_path, outputs),
+            lambda results: self.on_profile_exported(results, meme_data),
+            self.on_meme_save_failed
+        )
+    
+    def collect_meme_data(self, output_path):
+        return (
+            self.current_image_id,
+            self.top_text_edit.toPlainText(),
+            self.bottom_text_edit.toPlainText(),
+            self.top_text_style['size'],
+            self.top_text_style['color'].name(),
+            self.top_text_style['outline_color'].name(),
+            self.top_text_style['has_outline'],
+            self.top_text_style['has_shadow'],
+            output_path,
+            self.top_text_style['font'],
+            self.filter_combo.currentText()
+        )
+    
+    def preview_interval(self):
+        # preview_interval_ms - пауза между перерисовками превью; неверное значение заменяется умолчанием
+        try:
+            interval = int(self.db.get_setting('preview_interval_ms', PREVIEW_INTERVAL_MS))
+        except (ValueError, TypeError):
+            interval = PREVIEW_INTERVAL_MS
+        return max(MIN_PREVIEW_INTERVAL_MS, interval)
+    
+    def export_settings(self, fmt):
+        # export_options - JSON вида {"jpeg": {"quality": 85, "progressive": true}, "png": {"compress_level": 9}};
+        # export_max_bytes - лимит размера файла в байтах, 0 - без лимита
+        try:
+            options = json.loads(self.db.get_setting('export_options', '{}')).get(fmt)
+        except (ValueError, AttributeError):
+            options = None
+        try:
+            max_bytes = int(self.db.get_setting('export_max_bytes', 0)) or None
+        except ValueError:
+            max_bytes = None
+        return options, max_bytes
+    
+    def record_export(self, meme_data, results):
+        def record(uow):
+            # Мем того же изображения, сохраненный повторно, получает новую версию, а не новую запись.
+            # current_meme_id читается и меняется только здесь, в потоке записи, поэтому подряд
+            # идущие сохранения видят результат предыдущего
+            meme_id = self.current_meme_id
+            if meme_id is None or uow.update_meme(meme_id, *meme_data) is None:
+                meme_id = uow.save_meme(*meme_data)
+            uow.save_outputs(meme_id, results)
+            uow.increment_downloads(meme_id)
+            self.current_meme_id = meme_id
+            return meme_id
+        
+        # Мем, его файлы и счетчик скачиваний фиксируются одной транзакцией; интерфейс ее не ждет,
+        # результат приходит сигналом meme_recorded в поток интерфейса
+        future = self.db.transaction(record, MEME_TABLES)
+        future.add_done_callback(lambda future: self.meme_recorded.emit(meme_data[8], future.exception()))
+    
+    def on_meme_recorded(self, path, error):
+        if error is not None:
+            QMessageBox.warning(self, "Ошибка", f"Файл сохранен, но не записан в историю: {error}")
+            return
+        self.thumbnail_loader.request(path)
+    
+    def on_meme_saved(self, result, meme_data):
+        self.record_export(meme_data, [result])
+        
+        if result['target_met']:
+            QMessageBox.information(self, "Успех", "Мем успешно сохранен!")
+        else:
+            QMessageBox.warning(self, "Внимание",
+                                f"Мем сохранен, но файл ({result['bytes'] // 1024} КБ) не уложился в лимит размера")
+    
+    def on_profile_exported(self, results, meme_data):
+        self.record_export(meme_data, results)
+        
+        files = "\n".join(
+            f"{os.path.basename(result['path'])} - {result['width']}x{result['height']}, {result['bytes'] // 1024} КБ"
+            for result in results
+        )
+        QMessageBox.information(self, "Успех", f"Сохранено файлов: {len(results)}\n{files}")
+    
+    def on_meme_save_failed(self, error):
+        QMessageBox.warning(self, "Ошибка", f"Не удалось сохранить файл: {error}")
     
     def copy_to_clipboard(self):
-        if self.displayed_pixmap and not self.displayed_pixmap.isNull():
-            clipboard = QApplication.clipboard()
-            clipboard.setPixmap(self.displayed_pixmap)
+        if self.original_image and not self.original_image.isNull():
+            self.export_worker.submit(
+                self.full_resolution_job(),
+                lambda image: QApplication.clipboard().setImage(image)
+            )
     
     def export_statistics(self):
-        dialog = StatisticsDialog(self.db, self)
-        dialog.exec()
+        self.get_statistics_dialog().exec()
     
     def show_statistics(self):
-        dialog = StatisticsDialog(self.db, self)
-        dialog.exec()
+        self.get_statistics_dialog().exec()
     
     def show_history(self):
-        recent = self.db.get_recent_memes()
+        recent = self.db.get_recent_memes(HISTORY_LIMIT)
         if recent:
             dialog = QDialog(self)
             dialog.setWindowTitle("История мемов")
@@ -692,19 +982,46 @@ class MemeGeneratorPro(QMainWindow):
             
             screen = QApplication.primaryScreen().geometry()
             dialog.setGeometry(
-                screen.width() // 2 - 250,
-                screen.height() // 2 - 150,
-                500, 300
+                screen.width() // 2 - 400,
+                screen.height() // 2 - 300,
+                800, 600
             )
             
             layout = QVBoxLayout()
             list_widget = QListWidget()
+            list_widget.setViewMode(QListView.ViewMode.IconMode)
+            list_widget.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            list_widget.setGridSize(QSize(THUMBNAIL_SIZE + 24, THUMBNAIL_SIZE + 36))
+            list_widget.setResizeMode(QListView.ResizeMode.Adjust)
+            list_widget.setMovement(QListView.Movement.Static)
+            list_widget.setUniformItemSizes(True)
             
+            # Миниатюры читаются из кэша в фоне; пропавшие файлы убираются из списка по ответу загрузчика
+            placeholder = QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+            placeholder.fill(QColor("#0F3460"))
+            placeholder_icon = QIcon(placeholder)
+            items = {}
             for path in recent:
-                if os.path.exists(path):
-                    item = QListWidgetItem(os.path.basename(path))
-                    item.file_path = path
-                    list_widget.addItem(item)
+                if path in items:
+                    continue
+                item = QListWidgetItem(placeholder_icon, os.path.basename(path))
+                item.file_path = path
+                list_widget.addItem(item)
+                items[path] = item
+            
+            def on_thumbnail(path, image):
+                item = items.get(path)
+                if item is not None:
+                    item.setIcon(QIcon(QPixmap.fromImage(image)))
+            
+            def on_thumbnail_failed(path, error):
+                if path in items and not os.path.exists(path):
+                    list_widget.takeItem(list_widget.row(items.pop(path)))
+            
+            self.thumbnail_loader.loaded.connect(on_thumbnail)
+            self.thumbnail_loader.failed.connect(on_thumbnail_failed)
+            for path in items:
+                self.thumbnail_loader.request(path)
             
             layout.addWidget(list_widget)
             
@@ -727,6 +1044,10 @@ class MemeGeneratorPro(QMainWindow):
             layout.addLayout(button_layout)
             dialog.setLayout(layout)
             dialog.exec()
+            
+            self.thumbnail_loader.cancel()
+            self.thumbnail_loader.loaded.disconnect(on_thumbnail)
+            self.thumbnail_loader.failed.disconnect(on_thumbnail_failed)
         else:
             QMessageBox.information(self, "История", "Нет сохраненных мемов")
     
@@ -749,16 +1070,16 @@ class MemeGeneratorPro(QMainWindow):
             if reply == QMessageBox.StandardButton.Yes:
                 try:
                     os.remove(item.file_path)
+                    self.thumbnail_cache.invalidate(item.file_path)
                     list_widget.takeItem(list_widget.row(item))
                 except Exception as e:
                     QMessageBox.warning(self, "Ошибка", f"Не удалось удалить: {str(e)}")
     
     def generate_random_meme(self):
-        if not self.original_pixmap:
+        if not self.original_image and not self.loading_path:
             recent = self.db.get_recent_images()
             if recent:
-                self.original_pixmap = ImageProcessor.load_image(recent[0])
-                self.current_pixmap = self.original_pixmap.copy()
+                self.open_image(recent[0])
             else:
                 QMessageBox.warning(self, "Ошибка", "Нет доступных изображений")
                 return
@@ -789,32 +1110,44 @@ class MemeGeneratorPro(QMainWindow):
         
         filter_choice = random.choice(['Нет', 'Черно-белый', 'Сепия', 'Размытие'])
         self.filter_combo.setCurrentText(filter_choice)
-        self.apply_filter(filter_choice)
-        
-        self.update_preview()
+        self.preview_scheduler.schedule(PreviewScheduler.FILTER, PreviewScheduler.TEXT)
         self.text_input_panel.show()
     
     def clear_all_text(self):
         self.top_text_edit.clear()
         self.bottom_text_edit.clear()
-        self.update_preview()
+        self.preview_scheduler.schedule(PreviewScheduler.TEXT)
     
     def load_settings(self):
         last_image = self.db.get_setting('last_image_path')
         if last_image and os.path.exists(last_image):
-            self.original_pixmap = ImageProcessor.load_image(last_image)
-            self.current_pixmap = self.original_pixmap.copy()
-            self.update_preview()
-            self.save_btn.setEnabled(True)
+            # Декодирование идет в фоне: окно отрисовывается сразу, без ожидания картинки
+            self.open_image(last_image, show_errors=False)
     
     def load_recent_images(self):
         pass
     
     def closeEvent(self, event):
+        self.load_worker.cancel()
+        self.load_worker.wait()
+        self.render_worker.wait()
+        self.export_worker.wait()
+        self.history_worker.wait()
+        self.thumbnail_loader.cancel()
+        self.thumbnail_loader.wait()
         self.db.close()
         event.accept()
     
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        if hasattr(self, 'current_pixmap') and self.current_pixmap and not self.current_pixmap.isNull():
-            self.show_pixmap(self.current_pixmap)
+        if self.original_image and not self.original_image.isNull() and not self.loading_path:
+            viewport_size = self.image_scroll.viewport().size()
+            target = self.original_image.size().scaled(viewport_size, Qt.AspectRatioMode.KeepAspectRatio)
+            if self.preview_image.width() < min(target.width(), self.original_image.width()):
+                source = self.original_image
+                self.load_worker.submit(
+                    self.preview_proxy_job(source),
+                    lambda preview: self.on_proxy_rebuilt(source, preview)
+                )
+        if hasattr(self, 'preview_scheduler'):
+            self.preview_scheduler.schedule(PreviewScheduler.DISPLAY)
@@ -1,39 +1,124 @@
-from PyQt6.QtGui import QPainter, QPixmap, QColor
-from PyQt6.QtCore import QRectF, Qt
+import threading
+from collections import OrderedDict
+from PyQt6.QtGui import QPainter, QImage
+from PyQt6.QtCore import QRect, Qt
+from .constants import TEXT_LAYER_CACHE_SIZE, BASE_LAYER_CACHE_SIZE
+from .render_spec import RenderSpec
 
 class MemeRenderer:
-    @staticmethod
-    def render_meme(image_pixmap, text_items):
-        result_pixmap = QPixmap(image_pixmap.size())
-        result_pixmap.fill(QColor(0, 0, 0, 0))
+    def __init__(self, max_text_layers=TEXT_LAYER_CACHE_SIZE, max_base_layers=BASE_LAYER_CACHE_SIZE):
+        self.max_text_layers = max_text_layers
+        self.max_base_layers = max_base_layers
+        self.lock = threading.Lock()
+        self.base_layers = OrderedDict()
+        self.text_layers = OrderedDict()
+        self.layer_renders = 0
+    
+    def render(self, source, spec, size=None):
+        # Один RenderSpec для превью, сохранения, буфера обмена и пакетной обработки:
+        # разметка задана в долях изображения и вычисляется для любого целевого размера
+        base = self.render_base(source, spec.pipeline, size)
+        return self.render_meme(base, spec)
+    
+    def render_base(self, source, pipeline, size=None):
+        if size is not None and size == source.size():
+            size = None
+        key = (source.cacheKey(), None if size is None else (size.width(), size.height()),
+               tuple(pipeline.operations))
+        
+        # Несколько последних слоев: отмена и повтор смены фильтра не перерисовывают основу заново
+        with self.lock:
+            if key in self.base_layers:
+                self.base_layers.move_to_end(key)
+                return self.base_layers[key]
+        
+        if size is not None:
+            source = source.scaled(size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        layer = pipeline.apply(source)
         
-        painter = QPainter(result_pixmap)
-        painter.drawPixmap(0, 0, image_pixmap)
+        with self.lock:
+            self.base_layers[key] = layer
+            while len(self.base_layers) > self.max_base_layers:
+                self.base_layers.popitem(last=False)
+        return layer
+    
+    def render_meme(self, image, spec):
+        layers = [self.render_text_layer(image.size(), caption) for caption in spec.captions]
         
-        for item in text_items:
-            if item['text'].strip():
-                MemeRenderer._draw_text_item(painter, result_pixmap.rect(), item)
+        if not layers:
+            return image
         
+        # У форматов без альфа-канала (RGBX8888 и т.п.) четвертый байт не гарантирован:
+        # перевод в RGB32 делает основу непрозрачной, иначе подпись ляжет на прозрачный фон
+        if not image.hasAlphaChannel():
+            image = image.convertToFormat(QImage.Format.Format_RGB32)
+        result = image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+        painter = QPainter(result)
+        for position, layer in layers:
+            painter.drawImage(position, layer)
         painter.end()
-        return result_pixmap
+        
+        return result
+    
+    def render_text_layer(self, size, caption):
+        key = (size.width(), size.height(), caption['text'], MemeRenderer.style_key(caption['style']),
+               RenderSpec.caption_box(caption)[0])
+        
+        with self.lock:
+            if key in self.text_layers:
+                self.text_layers.move_to_end(key)
+                return self.text_layers[key]
+        
+        layer = MemeRenderer._rasterize_caption(size, caption)
+        
+        with self.lock:
+            self.layer_renders += 1
+            self.text_layers[key] = layer
+            while len(self.text_layers) > self.max_text_layers:
+                self.text_layers.popitem(last=False)
+        return layer
+    
+    def clear_cache(self):
+        with self.lock:
+            self.base_layers.clear()
+            self.text_layers.clear()
+    
+    @staticmethod
+    def style_key(style):
+        return (
+            style['font'], style['size'],
+            style['color'].name(), style['color'].alpha(),
+            style['outline_color'].name(), style['outline_color'].alpha(),
+            style['has_outline'], style['has_shadow'],
+            style['gradient_type'] if style['has_gradient'] else None
+        )
     
     @staticmethod
-    def _draw_text_item(painter, rect, item):
+    def _rasterize_caption(size, caption):
         from .text_manager import TextManager
         
-        rectf = QRectF(rect)
+        style = caption['style']
+        text_rect, alignment = RenderSpec.caption_rect(caption, size)
+        padding = RenderSpec.margin_pixels(size)
         
-        if item['position'] == 'top':
-            text_rect = QRectF(0, 10, rectf.width(), rectf.height() // 2 - 10)
-            alignment = Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter
-        else:
-            text_rect = QRectF(0, rectf.height() // 2, rectf.width(), rectf.height() // 2 - 10)
-            alignment = Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignHCenter
+        layer_rect = text_rect.adjusted(-padding, -padding, padding, padding)
+        layer_rect = layer_rect.intersected(QRect(0, 0, size.width(), size.height()))
+        
+        layer = QImage(layer_rect.size(), QImage.Format.Format_ARGB32_Premultiplied)
+        layer.fill(Qt.GlobalColor.transparent)
+        
+        painter = QPainter(layer)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
         
         TextManager.draw_text(
-            painter, text_rect, item['text'], alignment,
-            item['style']['font'], item['style']['size'],
-            item['style']['color'], item['style']['outline_color'],
-            item['style']['has_outline'], item['style']['has_shadow'],
-            item['style']['gradient_type'] if item['style']['has_gradient'] else None
+            painter, text_rect.translated(-layer_rect.topLeft()), caption['text'], alignment,
+            style['font'], RenderSpec.font_pixels(style['size'], size),
+            style['color'], style['outline_color'],
+            style['has_outline'], style['has_shadow'],
+            style['gradient_type'] if style['has_gradient'] else None
         )
+        
+        painter.end()
+        return layer_rect.topLeft(), layer
@@ -0,0 +1,146 @@
+def create_tables(cursor):
+    cursor.execute('''CREATE TABLE IF NOT EXISTS images 
+                     (id INTEGER PRIMARY KEY, path TEXT, width INTEGER, height INTEGER, 
+                      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    
+    cursor.execute('''CREATE TABLE IF NOT EXISTS memes 
+                     (id INTEGER PRIMARY KEY, image_id INTEGER, top_text TEXT, bottom_text TEXT, 
+                      font_size INTEGER, text_color TEXT, outline_color TEXT, has_outline BOOLEAN, 
+                      has_shadow BOOLEAN, output_path TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                      FOREIGN KEY (image_id) REFERENCES images (id))''')
+    
+    cursor.execute('''CREATE TABLE IF NOT EXISTS meme_versions 
+                     (id INTEGER PRIMARY KEY, meme_id INTEGER, version_data TEXT, 
+                      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, 
+                      FOREIGN KEY (meme_id) REFERENCES memes (id))''')
+    
+    cursor.execute('''CREATE TABLE IF NOT EXISTS statistics 
+                     (id INTEGER PRIMARY KEY, meme_id INTEGER, views INTEGER DEFAULT 0,
+                      downloads INTEGER DEFAULT 0, likes INTEGER DEFAULT 0,
+                      last_viewed TIMESTAMP, FOREIGN KEY (meme_id) REFERENCES memes (id))''')
+    
+    cursor.execute('''CREATE TABLE IF NOT EXISTS user_settings 
+                     (id INTEGER PRIMARY KEY, setting_name TEXT UNIQUE, setting_value TEXT,
+                      updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+
+def add_indexes(cursor):
+    # Дубли статистики (старые базы) сливаются в одну строку, иначе уникальный индекс не создать
+    duplicates = cursor.execute('''SELECT meme_id, MIN(id), SUM(views), SUM(downloads), SUM(likes),
+                                  MAX(last_viewed) FROM statistics
+                                  GROUP BY meme_id HAVING COUNT(*) > 1''').fetchall()
+    for meme_id, keep_id, views, downloads, likes, last_viewed in duplicates:
+        cursor.execute('''UPDATE statistics SET views = ?, downloads = ?, likes = ?, last_viewed = ?
+                         WHERE id = ?''', (views, downloads, likes, last_viewed, keep_id))
+        cursor.execute("DELETE FROM statistics WHERE meme_id IS ? AND id != ?", (meme_id, keep_id))
+    
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_images_created_at ON images (created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_memes_created_at ON memes (created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_memes_image_id ON memes (image_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_meme_versions_meme_id ON meme_versions (meme_id)")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_statistics_meme_id ON statistics (meme_id)")
+
+def add_statistics_sort_indexes(cursor):
+    # Сортировка и постраничная выборка статистики идут по индексам, поэтому у каждого мема
+    # должна быть строка статистики, а сортируемые колонки не должны содержать NULL
+    cursor.execute('''INSERT INTO statistics (meme_id, views, downloads, likes)
+                     SELECT id, 0, 0, 0 FROM memes
+                     WHERE id NOT IN (SELECT meme_id FROM statistics WHERE meme_id IS NOT NULL)''')
+    cursor.execute("UPDATE memes SET top_text = '' WHERE top_text IS NULL")
+    cursor.execute("UPDATE memes SET bottom_text = '' WHERE bottom_text IS NULL")
+    cursor.execute('''UPDATE statistics SET views = COALESCE(views, 0), downloads = COALESCE(downloads, 0),
+                     likes = COALESCE(likes, 0)
+                     WHERE views IS NULL OR downloads IS NULL OR likes IS NULL''')
+    
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_memes_top_text ON memes (top_text)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_memes_bottom_text ON memes (bottom_text)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_statistics_views ON statistics (views, meme_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_statistics_downloads ON statistics (downloads, meme_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_statistics_likes ON statistics (likes, meme_id)")
+
+def add_daily_rollups(cursor):
+    cursor.execute("ALTER TABLE memes ADD COLUMN font TEXT")
+    cursor.execute("ALTER TABLE memes ADD COLUMN filter TEXT")
+    
+    cursor.execute('''CREATE TABLE IF NOT EXISTS daily_totals 
+                     (day TEXT PRIMARY KEY, memes INTEGER DEFAULT 0, views INTEGER DEFAULT 0,
+                      downloads INTEGER DEFAULT 0) WITHOUT ROWID''')
+    
+    # WITHOUT ROWID: строки лежат в порядке (day, ...), выборка за период читает их подряд
+    cursor.execute('''CREATE TABLE IF NOT EXISTS daily_meme_stats 
+                     (day TEXT, meme_id INTEGER, views INTEGER DEFAULT 0, downloads INTEGER DEFAULT 0,
+                      PRIMARY KEY (day, meme_id)) WITHOUT ROWID''')
+    
+    cursor.execute('''CREATE TABLE IF NOT EXISTS daily_usage 
+                     (day TEXT, kind TEXT, name TEXT, memes INTEGER DEFAULT 0, views INTEGER DEFAULT 0,
+                      downloads INTEGER DEFAULT 0, PRIMARY KEY (day, kind, name)) WITHOUT ROWID''')
+    
+    # Старые счетчики не знают дат: относим их ко дню последнего просмотра или создания мема
+    cursor.execute('''INSERT INTO daily_meme_stats (day, meme_id, views, downloads)
+                     SELECT date(COALESCE(s.last_viewed, m.created_at)), m.id, s.views, s.downloads
+                     FROM memes m JOIN statistics s ON m.id = s.meme_id
+                     WHERE s.views > 0 OR s.downloads > 0''')
+    cursor.execute('''INSERT INTO daily_totals (day, memes)
+                     SELECT date(created_at), COUNT(*) FROM memes GROUP BY date(created_at)''')
+    cursor.execute('''INSERT INTO daily_totals (day, views, downloads)
+                     SELECT day, SUM(views), SUM(downloads) FROM daily_meme_stats WHERE true GROUP BY day
+                     ON CONFLICT (day) DO UPDATE SET views = excluded.views, downloads = excluded.downloads''')
+
+def add_image_fingerprints(cursor):
+    cursor.execute("ALTER TABLE images ADD COLUMN content_hash TEXT")
+    cursor.execute("ALTER TABLE images ADD COLUMN file_size INTEGER")
+    cursor.execute("ALTER TABLE images ADD COLUMN mtime_ns INTEGER")
+    cursor.execute("ALTER TABLE images ADD COLUMN last_used_at TIMESTAMP")
+    cursor.execute("UPDATE images SET last_used_at = created_at")
+    
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_images_path ON images (path)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_images_content ON images (content_hash, file_size)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_images_last_used_at ON images (last_used_at)")
+
+def add_meme_outputs(cursor):
+    # Все файлы, сохраненные для одного мема (например, PNG и уменьшенные JPEG одного экспорта)
+    cursor.execute('''CREATE TABLE IF NOT EXISTS meme_outputs 
+                     (id INTEGER PRIMARY KEY, meme_id INTEGER NOT NULL, path TEXT NOT NULL, format TEXT,
+                      width INTEGER, height INTEGER, file_size INTEGER,
+                      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                      FOREIGN KEY (meme_id) REFERENCES memes (id))''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_meme_outputs_meme_id ON meme_outputs (meme_id)")
+    cursor.execute('''INSERT INTO meme_outputs (meme_id, path, created_at)
+                     SELECT id, output_path, created_at FROM memes WHERE output_path IS NOT NULL''')
+
+def add_version_chains(cursor):
+    # Версии нумеруются внутри мема; старые записи - полные состояния, то есть ключевые кадры
+    cursor.execute("ALTER TABLE meme_versions ADD COLUMN version INTEGER")
+    cursor.execute("ALTER TABLE meme_versions ADD COLUMN keyframe BOOLEAN NOT NULL DEFAULT 1")
+    cursor.execute('''UPDATE meme_versions SET version = (
+                         SELECT COUNT(*) FROM meme_versions v
+                         WHERE v.meme_id IS meme_versions.meme_id AND v.id <= meme_versions.id)''')
+    
+    cursor.execute("DROP INDEX IF EXISTS idx_meme_versions_meme_id")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_meme_versions_version ON meme_versions (meme_id, version)")
+
+# Индекс в списке + 1 = номер версии схемы (PRAGMA user_version).
+# Новые миграции только добавляются в конец, уже выпущенные не меняются.
+MIGRATIONS = [
+    create_tables,
+    add_indexes,
+    add_statistics_sort_indexes,
+    add_daily_rollups,
+    add_image_fingerprints,
+    add_meme_outputs,
+    add_version_chains,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def get_version(cursor):
+    return cursor.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(cursor, target=SCHEMA_VERSION):
+    version = get_version(cursor)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f"База данных версии {version} новее программы (версия схемы {SCHEMA_VERSION})")
+    
+    for number in range(version + 1, target + 1):
+        MIGRATIONS[number - 1](cursor)
+        cursor.execute(f"PRAGMA user_version = {number}")
+    return get_version(cursor)
@@ -0,0 +1,51 @@
+from PyQt6.QtCore import QObject
+from .constants import PREVIEW_INTERVAL_MS
+
+class PreviewScheduler(QObject):
+    FILTER = 'filter'
+    TEXT = 'text'
+    DISPLAY = 'display'
+    
+    def __init__(self, timer, callback, interval=PREVIEW_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.timer = timer
+        self.callback = callback
+        self.dirty = set()
+        self.requested_renders = 0
+        self.executed_renders = 0
+        
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+    
+    def schedule(self, *stages):
+        self.dirty.update(stages)
+        self.requested_renders += 1
+        
+        # Таймер не перезапускается: все сигналы за интервал сливаются в одну отрисовку
+        if not self.timer.isActive():
+            self.timer.start()
+    
+    def set_interval(self, interval):
+        self.timer.setInterval(max(0, int(interval)))
+    
+    def interval(self):
+        return self.timer.interval()
+    
+    def flush(self):
+        self.timer.stop()
+        if not self.dirty:
+            return
+        
+        stages = self.dirty
+        self.dirty = set()
+        self.executed_renders += 1
+        self.callback(stages)
+    
+    def cancel(self):
+        self.timer.stop()
+        self.dirty = set()
+    
+    def reset_counters(self):
+        self.requested_renders = 0
+        self.executed_renders = 0
@@ -0,0 +1,42 @@
+from PyQt6.QtCore import QRect, Qt
+from .constants import RENDER_REFERENCE_SIZE
+
+# Разметка подписей в долях ширины и высоты изображения: (x, y, ширина, высота), выравнивание.
+# Размер шрифта в стиле задан в пикселях для изображения с меньшей стороной RENDER_REFERENCE_SIZE
+# и масштабируется вместе с изображением, поэтому превью и сохраненный файл совпадают
+MARGIN = 0.025
+CAPTION_LAYOUT = {
+    'top': ((MARGIN, MARGIN, 1 - 2 * MARGIN, 1 / 3),
+            Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter),
+    'bottom': ((MARGIN, 2 / 3, 1 - 2 * MARGIN, 1 / 3 - MARGIN),
+               Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignHCenter),
+}
+
+class RenderSpec:
+    def __init__(self, pipeline, captions):
+        self.pipeline = pipeline
+        self.captions = [caption for caption in captions if caption['text'].strip()]
+    
+    @staticmethod
+    def scale(size):
+        return min(size.width(), size.height()) / RENDER_REFERENCE_SIZE
+    
+    @staticmethod
+    def font_pixels(style_size, size):
+        return max(1, round(style_size * RenderSpec.scale(size)))
+    
+    @staticmethod
+    def margin_pixels(size):
+        return max(1, round(MARGIN * min(size.width(), size.height())))
+    
+    @staticmethod
+    def caption_box(caption):
+        box, alignment = CAPTION_LAYOUT[caption['position']]
+        return caption.get('box', box), alignment
+    
+    @staticmethod
+    def caption_rect(caption, size):
+        (x, y, width, height), alignment = RenderSpec.caption_box(caption)
+        rect = QRect(round(x * size.width()), round(y * size.height()),
+                     round(width * size.width()), round(height * size.height()))
+        return rect, alignment
@@ -0,0 +1,102 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+class RenderSignals(QObject):
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+class RenderTask(QRunnable):
+    def __init__(self, generation, job, signals, is_wanted=None):
+        super().__init__()
+        self.generation = generation
+        self.job = job
+        self.signals = signals
+        self.is_wanted = is_wanted
+    
+    def run(self):
+        # Задача, вытесненная или отмененная до запуска, не выполняется: результат все равно отбросят
+        if self.is_wanted is not None and not self.is_wanted(self.generation):
+            self.signals.finished.emit(self.generation, None)
+            return
+        try:
+            result = self.job()
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        self.signals.finished.emit(self.generation, result)
+
+class RenderWorker(QObject):
+    def __init__(self, latest_only=True, parent=None):
+        super().__init__(parent)
+        self.latest_only = latest_only
+        self.generation = 0
+        self.cancelled = 0
+        self.in_flight = None
+        self.pending = []
+        self.callbacks = {}
+        
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        
+        self.signals = RenderSignals(self)
+        self.signals.finished.connect(self._on_finished)
+        self.signals.failed.connect(self._on_failed)
+    
+    def submit(self, job, callback=None, error_callback=None):
+        self.generation += 1
+        self.callbacks[self.generation] = (callback, error_callback)
+        
+        if self.latest_only:
+            for generation, _ in self.pending:
+                self.callbacks.pop(generation, None)
+            self.pending = []
+        
+        self.pending.append((self.generation, job))
+        self._start_next()
+        return self.generation
+    
+    def cancel(self):
+        # Очередь сбрасывается; задача в пуле, которая еще не началась, не выполнится,
+        # а результат уже начатой будет проигнорирован
+        self.cancelled = self.generation
+        for generation, _ in self.pending:
+            self.callbacks.pop(generation, None)
+        self.pending = []
+        if self.in_flight is not None:
+            self.callbacks[self.in_flight] = (None, None)
+    
+    def is_busy(self):
+        return self.in_flight is not None or bool(self.pending)
+    
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+    
+    def _start_next(self):
+        if self.in_flight is not None or not self.pending:
+            return
+        
+        generation, job = self.pending.pop(0)
+        self.in_flight = generation
+        self.pool.start(RenderTask(generation, job, self.signals, self._is_wanted))
+    
+    def _on_finished(self, generation, result):
+        callback, _ = self._finish(generation)
+        if callback and self._is_current(generation):
+            callback(result)
+    
+    def _on_failed(self, generation, message):
+        _, error_callback = self._finish(generation)
+        if error_callback and self._is_current(generation):
+            error_callback(message)
+    
+    def _finish(self, generation):
+        self.in_flight = None
+        callbacks = self.callbacks.pop(generation, (None, None))
+        self._start_next()
+        return callbacks
+    
+    def _is_wanted(self, generation):
+        # Вызывается из потока пула: читаются только целые счетчики
+        return generation > self.cancelled and self._is_current(generation)
+    
+    def _is_current(self, generation):
+        return not self.latest_only or generation == self.generation
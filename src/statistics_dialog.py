@@ -0,0 +1,249 @@
+from PyQt6.QtWidgets import *
+from PyQt6.QtCore import *
+from PyQt6.QtGui import *
+from .statistics_model import StatisticsModel
+from .statistics_export import StatisticsExportThread
+from .analytics import Analytics
+
+EXPORT_FILTERS = {
+    "CSV (*.csv)": ".csv",
+    "CSV, gzip (*.csv.gz)": ".csv.gz",
+    "JSON Lines (*.jsonl)": ".jsonl",
+    "JSON Lines, gzip (*.jsonl.gz)": ".jsonl.gz"
+}
+
+ANALYTICS_PERIODS = {
+    "Сегодня": 1,
+    "7 дней": 7,
+    "30 дней": 30,
+    "Год": 365,
+    "Все время": None
+}
+
+class StatisticsDialog(QDialog):
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.analytics = Analytics(db)
+        self.export_thread = None
+        self.setWindowTitle("Статистика мемов")
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #1A1A2E;
+                color: white;
+                font-family: Arial;
+            }
+            QLabel {
+                color: #E6E6FA;
+                font-size: 12px;
+                padding: 3px;
+            }
+            QTableView {
+                background-color: #16213E;
+                color: white;
+                gridline-color: #8A2BE2;
+                font-size: 11px;
+                selection-background-color: #8A2BE2;
+            }
+            QTabWidget::pane {
+                border: 1px solid #8A2BE2;
+            }
+            QTabBar::tab {
+                background-color: #0F3460;
+                color: white;
+                padding: 6px 14px;
+            }
+            QTabBar::tab:selected {
+                background-color: #8A2BE2;
+            }
+            QHeaderView::section {
+                background-color: #0F3460;
+                color: white;
+                padding: 6px;
+                font-weight: bold;
+                border: 1px solid #8A2BE2;
+            }
+        """)
+        self.init_ui()
+        self.center_window()
+    
+    def init_ui(self):
+        layout = QVBoxLayout()
+        layout.setSpacing(10)
+        layout.setContentsMargins(15, 15, 15, 15)
+        
+        # Строки подгружаются страницами по мере прокрутки, сортировка выполняется в базе
+        self.model = StatisticsModel(self.db, parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        header.setDefaultAlignment(Qt.AlignmentFlag.AlignCenter)
+        header.setSortIndicator(self.model.sort_column, Qt.SortOrder.DescendingOrder)
+        self.table.setSortingEnabled(True)
+        
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.table, "Все мемы")
+        self.tabs.addTab(self.create_analytics_tab(), "Аналитика")
+        self.tabs.currentChanged.connect(self.load_analytics)
+        layout.addWidget(self.tabs)
+        
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(10)
+        
+        from .constants import BUTTON_STYLE
+        
+        export_csv_btn = QPushButton("Экспорт в CSV")
+        export_csv_btn.setStyleSheet(BUTTON_STYLE)
+        export_csv_btn.clicked.connect(self.export_to_csv)
+        
+        refresh_btn = QPushButton("Обновить")
+        refresh_btn.setStyleSheet(BUTTON_STYLE)
+        refresh_btn.clicked.connect(self.load_data)
+        
+        close_btn = QPushButton("Закрыть")
+        close_btn.setStyleSheet(BUTTON_STYLE)
+        close_btn.clicked.connect(self.close)
+        
+        button_layout.addWidget(export_csv_btn)
+        button_layout.addWidget(refresh_btn)
+        button_layout.addWidget(close_btn)
+        
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+    
+    def create_analytics_tab(self):
+        tab = QWidget()
+        layout = QGridLayout(tab)
+        layout.setSpacing(8)
+        
+        period_layout = QHBoxLayout()
+        period_layout.addWidget(QLabel("Период:"))
+        self.period_combo = QComboBox()
+        self.period_combo.addItems(ANALYTICS_PERIODS)
+        self.period_combo.setCurrentText("7 дней")
+        self.period_combo.currentTextChanged.connect(self.load_analytics)
+        period_layout.addWidget(self.period_combo)
+        self.totals_label = QLabel()
+        period_layout.addWidget(self.totals_label, 1)
+        layout.addLayout(period_layout, 0, 0, 1, 2)
+        
+        self.top_views_table = self.create_aggregate_table(["ID", "Текст", "Просмотры"])
+        self.top_downloads_table = self.create_aggregate_table(["ID", "Текст", "Скачивания"])
+        self.font_table = self.create_aggregate_table(["Шрифт", "Мемы", "Просмотры", "Скачивания"])
+        self.filter_table = self.create_aggregate_table(["Фильтр", "Мемы", "Просмотры", "Скачивания"])
+        self.series_table = self.create_aggregate_table(["День", "Мемы", "Просмотры", "Скачивания"])
+        
+        for index, (title, table) in enumerate([
+            ("Топ по просмотрам", self.top_views_table),
+            ("Топ по скачиваниям", self.top_downloads_table),
+            ("Шрифты", self.font_table),
+            ("Фильтры", self.filter_table)
+        ]):
+            box = QVBoxLayout()
+            box.addWidget(QLabel(title))
+            box.addWidget(table)
+            layout.addLayout(box, 1 + index // 2, index % 2)
+        
+        series_box = QVBoxLayout()
+        series_box.addWidget(QLabel("По дням"))
+        series_box.addWidget(self.series_table)
+        layout.addLayout(series_box, 1, 2, 2, 1)
+        
+        return tab
+    
+    def create_aggregate_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        header.setDefaultAlignment(Qt.AlignmentFlag.AlignCenter)
+        return table
+    
+    def fill_aggregate_table(self, table, rows):
+        table.setRowCount(len(rows))
+        for row_idx, row_data in enumerate(rows):
+            for col_idx, cell_data in enumerate(row_data):
+                item = QTableWidgetItem(str(cell_data))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                table.setItem(row_idx, col_idx, item)
+    
+    def load_analytics(self, *args):
+        # Агрегаты читаются из дневных сводных таблиц и только когда вкладка открыта
+        if self.tabs.currentIndex() != 1:
+            return
+        
+        days = ANALYTICS_PERIODS[self.period_combo.currentText()]
+        memes, views, downloads = self.analytics.totals(days)
+        self.totals_label.setText(f"Создано мемов: {memes}   Просмотров: {views}   Скачиваний: {downloads}")
+        
+        def caption(top, bottom):
+            return " / ".join(text.replace("\n", " ") for text in (top, bottom) if text)
+        
+        self.fill_aggregate_table(self.top_views_table, [
+            (meme_id, caption(top, bottom), views)
+            for meme_id, top, bottom, views, _ in self.analytics.top_memes(days, 'views')
+        ])
+        self.fill_aggregate_table(self.top_downloads_table, [
+            (meme_id, caption(top, bottom), downloads)
+            for meme_id, top, bottom, _, downloads in self.analytics.top_memes(days, 'downloads')
+        ])
+        self.fill_aggregate_table(self.font_table, self.analytics.font_usage(days))
+        self.fill_aggregate_table(self.filter_table, self.analytics.filter_usage(days))
+        self.fill_aggregate_table(self.series_table, list(reversed(self.analytics.time_series(days))))
+    
+    def load_data(self):
+        self.model.refresh()
+        self.load_analytics()
+    
+    def export_to_csv(self):
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Сохранить статистику", "meme_statistics.csv", ";;".join(EXPORT_FILTERS)
+        )
+        if not file_path:
+            return
+        if not file_path.lower().endswith(tuple(EXPORT_FILTERS.values())):
+            file_path += EXPORT_FILTERS.get(selected_filter, ".csv")
+        
+        # Экспорт идет в отдельном потоке, окно показывает прогресс и позволяет отменить
+        self.export_progress = QProgressDialog("Экспорт статистики...", "Отмена", 0, 0, self)
+        self.export_progress.setWindowTitle("Экспорт")
+        self.export_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.export_progress.setMinimumDuration(300)
+        
+        self.export_thread = StatisticsExportThread(self.db, file_path, self)
+        self.export_thread.progress.connect(self.on_export_progress)
+        self.export_thread.completed.connect(self.on_export_completed)
+        self.export_thread.failed.connect(self.on_export_failed)
+        self.export_progress.canceled.connect(self.export_thread.cancel)
+        self.export_thread.start()
+    
+    def on_export_progress(self, exported, total):
+        self.export_progress.setMaximum(max(total, 1))
+        self.export_progress.setValue(min(exported, total))
+    
+    def on_export_completed(self, exported):
+        self.export_progress.reset()
+        if self.export_thread.cancelled:
+            return
+        QMessageBox.information(self, "Успех", f"Статистика экспортирована: {exported} строк")
+    
+    def on_export_failed(self, error):
+        self.export_progress.reset()
+        QMessageBox.warning(self, "Ошибка", f"Не удалось экспортировать статистику: {error}")
+    
+    def done(self, result):
+        if self.export_thread is not None:
+            self.export_thread.cancel()
+            self.export_thread.wait()
+        super().done(result)
+    
+    def center_window(self):
+        screen = QApplication.primaryScreen().geometry()
+        self.setGeometry(
+            screen.width() // 2 - 400,
+            screen.height() // 2 - 250,
+            800, 500
+        )
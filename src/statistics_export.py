@@ -0,0 +1,26 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+
+class StatisticsExportThread(QThread):
+    progress = pyqtSignal(int, int)
+    completed = pyqtSignal(int)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, db, file_path, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.file_path = file_path
+        self.cancelled = False
+    
+    def cancel(self):
+        self.cancelled = True
+    
+    def run(self):
+        try:
+            exported = self.db.export_statistics(
+                self.file_path,
+                progress=self.progress.emit,
+                is_cancelled=lambda: self.cancelled
+            )
+            self.completed.emit(exported)
+        except Exception as e:
+            self.failed.emit(str(e))
@@ -0,0 +1,78 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from .constants import STATISTICS_PAGE_SIZE
+
+STATISTICS_HEADERS = [
+    "ID", "Верхний текст", "Нижний текст", "Дата",
+    "Просмотры", "Скачивания", "Лайки"
+]
+
+class StatisticsModel(QAbstractTableModel):
+    def __init__(self, db, page_size=STATISTICS_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.page_size = page_size
+        self.sort_column = 3
+        self.descending = True
+        self.rows = []
+        self.exhausted = False
+        self.pages_loaded = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(STATISTICS_HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(self.rows[index.row()][index.column()])
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return STATISTICS_HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+
+        rows = self.fetch_page()
+        if not rows:
+            return
+
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+    def fetch_page(self):
+        after = None
+        if self.rows:
+            last = self.rows[-1]
+            after = (last[self.sort_column], last[0])
+
+        rows = self.db.get_statistics_page(self.sort_column, self.descending, after, self.page_size)
+        self.pages_loaded += 1
+        if len(rows) < self.page_size:
+            self.exhausted = True
+        return rows
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_column = column
+        self.descending = order == Qt.SortOrder.DescendingOrder
+        self.refresh()
+
+    def refresh(self):
+        # Сортировка выполняется в SQL: сбрасываем загруженные строки и читаем первую страницу заново
+        self.beginResetModel()
+        self.rows = []
+        self.exhausted = False
+        self.rows = self.fetch_page()
+        self.endResetModel()
@@ -1,132 +1,157 @@
-from PyQt6.QtWidgets import *
-from PyQt6.QtCore import *
-from PyQt6.QtGui import *
-from .constants import BUTTON_STYLE
+import threading
+from collections import OrderedDict
+from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtGui import (QColor, QFont, QFontMetricsF, QPainter, QPainterPath, QPainterPathStroker,
+                         QBrush, QLinearGradient, QRadialGradient, QConicalGradient)
+from .constants import GLYPH_PATH_CACHE_SIZE
 
-class TextStyleDialog(QDialog):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Стиль текста")
-        self.setStyleSheet("""
-            QDialog {
-                background-color: #1A1A2E;
-                color: white;
-                font-family: Arial;
-            }
-            QLabel {
-                color: #E6E6FA;
-                font-size: 12px;
-                padding: 3px;
-            }
-            QFontComboBox, QSpinBox, QComboBox {
-                background-color: #16213E;
-                color: white;
-                border: 1px solid #8A2BE2;
-                border-radius: 4px;
-                padding: 5px;
-                font-size: 12px;
-                selection-background-color: #8A2BE2;
-            }
-            QCheckBox {
-                color: #E6E6FA;
-                font-size: 12px;
-                padding: 5px;
-            }
-            QCheckBox::indicator {
-                width: 16px;
-                height: 16px;
-                border: 1px solid #8A2BE2;
-                border-radius: 3px;
-                background-color: #16213E;
-            }
-            QCheckBox::indicator:checked {
-                background-color: #8A2BE2;
-            }
-        """)
-        self.text_color = QColor(255, 255, 255)
-        self.outline_color = QColor(0, 0, 0)
-        self.init_ui()
-        self.center_window()
+SHADOW_COLOR = QColor(0, 0, 0, 160)
+
+class TextManager:
+    path_cache = OrderedDict()
+    cache_lock = threading.Lock()
+    cache_hits = 0
+    cache_misses = 0
+    
+    @staticmethod
+    def draw_text(painter, rect, text, alignment, font_family, size, color,
+                  outline_color, has_outline, has_shadow, gradient_type=None):
+        if not text.strip():
+            return
+        
+        entry = TextManager._get_entry(text, font_family, size, rect.width(), rect.height(), alignment)
+        path = entry['path']
+        
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.translate(QPointF(rect.topLeft()))
+        
+        if has_shadow:
+            offset = max(2.0, size / 15)
+            painter.translate(offset, offset)
+            painter.fillPath(path, QBrush(SHADOW_COLOR))
+            painter.translate(-offset, -offset)
+        
+        if has_outline:
+            outline = TextManager._get_outline(entry, max(2.0, size / 12))
+            painter.fillPath(outline, QBrush(outline_color))
+        
+        painter.fillPath(path, TextManager._make_brush(path, color, outline_color, gradient_type))
+        painter.restore()
+    
+    @staticmethod
+    def get_text_path(text, font_family, size, width, height, alignment):
+        return TextManager._get_entry(text, font_family, size, width, height, alignment)['path']
+    
+    @staticmethod
+    def _get_entry(text, font_family, size, width, height, alignment):
+        key = (text, font_family, size, width, height, int(alignment.value))
+        
+        with TextManager.cache_lock:
+            entry = TextManager.path_cache.get(key)
+            if entry is not None:
+                TextManager.path_cache.move_to_end(key)
+                TextManager.cache_hits += 1
+                return entry
+        
+        entry = {
+            'path': TextManager._build_path(text, font_family, size, width, height, alignment),
+            'outlines': {}
+        }
+        
+        with TextManager.cache_lock:
+            TextManager.cache_misses += 1
+            TextManager.path_cache[key] = entry
+            while len(TextManager.path_cache) > GLYPH_PATH_CACHE_SIZE:
+                TextManager.path_cache.popitem(last=False)
+        return entry
     
-    def init_ui(self):
-        layout = QVBoxLayout()
-        layout.setSpacing(8)
-        layout.setContentsMargins(15, 15, 15, 15)
-        
-        font_layout = QHBoxLayout()
-        font_layout.addWidget(QLabel("Шрифт:"))
-        self.font_combo = QFontComboBox()
-        self.font_combo.setCurrentFont(QFont("Impact"))
-        font_layout.addWidget(self.font_combo)
-        layout.addLayout(font_layout)
-        
-        size_layout = QHBoxLayout()
-        size_layout.addWidget(QLabel("Размер:"))
-        self.size_spin = QSpinBox()
-        self.size_spin.setRange(10, 150)
-        self.size_spin.setValue(48)
-        size_layout.addWidget(self.size_spin)
-        layout.addLayout(size_layout)
-        
-        colors_layout = QGridLayout()
-        
-        self.color_btn = QPushButton("Цвет текста")
-        self.color_btn.setStyleSheet(BUTTON_STYLE)
-        self.color_btn.clicked.connect(self.choose_color)
-        
-        self.outline_btn = QPushButton("Цвет обводки")
-        self.outline_btn.setStyleSheet(BUTTON_STYLE)
-        self.outline_btn.clicked.connect(self.choose_outline_color)
-        
-        colors_layout.addWidget(self.color_btn, 0, 0)
-        colors_layout.addWidget(self.outline_btn, 0, 1)
-        
-        layout.addLayout(colors_layout)
-        
-        self.outline_cb = QCheckBox("Обводка")
-        self.shadow_cb = QCheckBox("Тень")
-        self.gradient_cb = QCheckBox("Градиент")
-        
-        layout.addWidget(self.outline_cb)
-        layout.addWidget(self.shadow_cb)
-        layout.addWidget(self.gradient_cb)
-        
-        gradient_layout = QHBoxLayout()
-        gradient_layout.addWidget(QLabel("Тип градиента:"))
-        self.gradient_combo = QComboBox()
-        self.gradient_combo.addItems(["Линейный", "Радиальный", "Конический"])
-        gradient_layout.addWidget(self.gradient_combo)
-        layout.addLayout(gradient_layout)
-        
-        button_layout = QHBoxLayout()
-        ok_btn = QPushButton("Применить")
-        ok_btn.setStyleSheet(BUTTON_STYLE)
-        cancel_btn = QPushButton("Отмена")
-        cancel_btn.setStyleSheet(BUTTON_STYLE)
-        
-        ok_btn.clicked.connect(self.accept)
-        cancel_btn.clicked.connect(self.reject)
-        
-        button_layout.addWidget(ok_btn)
-        button_layout.addWidget(cancel_btn)
-        
-        layout.addLayout(button_layout)
-        self.setLayout(layout)
+    @staticmethod
+    def _get_outline(entry, width):
+        outline = entry['outlines'].get(width)
+        if outline is None:
+            stroker = QPainterPathStroker()
+            stroker.setWidth(width)
+            stroker.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
+            outline = stroker.createStroke(entry['path'])
+            entry['outlines'][width] = outline
+        return outline
     
-    def choose_color(self):
-        color = QColorDialog.getColor(self.text_color, self, "Выберите цвет текста")
-        if color.isValid():
-            self.text_color = color
+    @staticmethod
+    def clear_cache():
+        with TextManager.cache_lock:
+            TextManager.path_cache.clear()
+            TextManager.cache_hits = 0
+            TextManager.cache_misses = 0
     
-    def choose_outline_color(self):
-        color = QColorDialog.getColor(self.outline_color, self, "Выберите цвет обводки")
-        if color.isValid():
-            self.outline_color = color
+    @staticmethod
+    def _build_path(text, font_family, size, width, height, alignment):
+        font = QFont(font_family)
+        font.setPixelSize(max(1, int(size)))
+        metrics = QFontMetricsF(font)
+        
+        lines = []
+        for paragraph in text.split('\n'):
+            lines.extend(TextManager._wrap_line(paragraph, metrics, width))
+        
+        line_height = metrics.lineSpacing()
+        text_height = line_height * len(lines)
+        
+        if alignment & Qt.AlignmentFlag.AlignBottom:
+            top = height - text_height
+        elif alignment & Qt.AlignmentFlag.AlignVCenter:
+            top = (height - text_height) / 2
+        else:
+            top = 0
+        
+        path = QPainterPath()
+        for index, line in enumerate(lines):
+            line_width = metrics.horizontalAdvance(line)
+            if alignment & Qt.AlignmentFlag.AlignLeft:
+                x = 0
+            elif alignment & Qt.AlignmentFlag.AlignRight:
+                x = width - line_width
+            else:
+                x = (width - line_width) / 2
+            
+            baseline = top + index * line_height + metrics.ascent()
+            path.addText(QPointF(x, baseline), font, line)
+        
+        return path
     
-    def center_window(self):
-        screen = QApplication.primaryScreen().geometry()
-        self.setGeometry(
-            screen.width() // 2 - 200,
-            screen.height() // 2 - 200,
-            400, 400
-        )
+    @staticmethod
+    def _wrap_line(paragraph, metrics, width):
+        words = paragraph.split()
+        if not words:
+            return [""]
+        
+        lines = []
+        current = words[0]
+        for word in words[1:]:
+            candidate = current + " " + word
+            if metrics.horizontalAdvance(candidate) <= width:
+                current = candidate
+            else:
+                lines.append(current)
+                current = word
+        lines.append(current)
+        return lines
+    
+    @staticmethod
+    def _make_brush(path, color, outline_color, gradient_type):
+        if not gradient_type:
+            return QBrush(color)
+        
+        bounds = path.boundingRect()
+        center = bounds.center()
+        
+        if gradient_type == "Радиальный":
+            gradient = QRadialGradient(center, max(bounds.width(), bounds.height()) / 2)
+        elif gradient_type == "Конический":
+            gradient = QConicalGradient(center, 90)
+        else:
+            gradient = QLinearGradient(bounds.topLeft(), bounds.bottomLeft())
+        
+        gradient.setColorAt(0, color)
+        gradient.setColorAt(1, outline_color)
+        return QBrush(gradient)
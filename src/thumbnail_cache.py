@@ -0,0 +1,160 @@
+import os
+import time
+import hashlib
+import threading
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, QSize, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader
+from .constants import THUMBNAIL_SIZE, THUMBNAIL_CACHE_BYTES
+
+class ThumbnailCache:
+    def __init__(self, directory, size=THUMBNAIL_SIZE, max_bytes=THUMBNAIL_CACHE_BYTES):
+        self.directory = directory
+        self.size = QSize(size, size)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.total_bytes = None
+        os.makedirs(directory, exist_ok=True)
+    
+    def path_for(self, source):
+        name = hashlib.blake2b(os.path.abspath(source).encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.directory, name + ".thumb")
+    
+    def get(self, source):
+        # mtime миниатюры = mtime исходника: если исходник изменился, миниатюра устарела.
+        # atime миниатюры ставим сами - это время последнего использования для LRU
+        source_stat = os.stat(source)
+        thumb_path = self.path_for(source)
+        try:
+            thumb_stat = os.stat(thumb_path)
+        except OSError:
+            return None
+        if thumb_stat.st_mtime_ns != source_stat.st_mtime_ns:
+            return None
+        
+        image = QImage(thumb_path)
+        if image.isNull():
+            return None
+        os.utime(thumb_path, ns=(time.time_ns(), source_stat.st_mtime_ns))
+        return image
+    
+    def get_or_create(self, source):
+        image = self.get(source)
+        if image is not None:
+            return image
+        
+        source_mtime = os.stat(source).st_mtime_ns
+        reader = QImageReader(source)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid() and (size.width() > self.size.width() or size.height() > self.size.height()):
+            # Для JPEG уменьшение происходит прямо при декодировании
+            reader.setScaledSize(size.scaled(self.size, Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            raise ValueError(f"Не удалось прочитать {source}: {reader.errorString()}")
+        if image.width() > self.size.width() or image.height() > self.size.height():
+            image = image.scaled(self.size, Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+        
+        thumb_path = self.path_for(source)
+        old_size = os.path.getsize(thumb_path) if os.path.exists(thumb_path) else 0
+        temp_path = thumb_path + ".tmp"
+        image.save(temp_path, "PNG" if image.hasAlphaChannel() else "JPG", 85)
+        os.replace(temp_path, thumb_path)
+        os.utime(thumb_path, ns=(time.time_ns(), source_mtime))
+        
+        self._account(os.path.getsize(thumb_path) - old_size)
+        return image
+    
+    def invalidate(self, source):
+        thumb_path = self.path_for(source)
+        try:
+            size = os.path.getsize(thumb_path)
+            os.remove(thumb_path)
+        except OSError:
+            return
+        self._account(-size)
+    
+    def _account(self, delta):
+        with self.lock:
+            if self.total_bytes is None:
+                self.total_bytes = sum(entry.stat().st_size for entry in self._entries())
+            else:
+                self.total_bytes += delta
+            over_budget = self.total_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+    
+    def _entries(self):
+        with os.scandir(self.directory) as entries:
+            return [entry for entry in entries if entry.name.endswith(".thumb")]
+    
+    def evict(self):
+        # Удаляем давно не использованные миниатюры, пока кэш не уложится в 80% бюджета
+        with self.lock:
+            entries = []
+            for entry in self._entries():
+                stat = entry.stat()
+                entries.append((stat.st_atime_ns, stat.st_size, entry.path))
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * 0.8
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+            self.total_bytes = total
+
+class ThumbnailSignals(QObject):
+    loaded = pyqtSignal(str, QImage)
+    failed = pyqtSignal(str, str)
+
+class ThumbnailTask(QRunnable):
+    def __init__(self, cache, source, signals):
+        super().__init__()
+        self.cache = cache
+        self.source = source
+        self.signals = signals
+    
+    def run(self):
+        try:
+            image = self.cache.get_or_create(self.source)
+        except Exception as e:
+            self.signals.failed.emit(self.source, str(e))
+            return
+        self.signals.loaded.emit(self.source, image)
+
+class ThumbnailLoader(QObject):
+    def __init__(self, cache, threads=2, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.pending = set()
+        
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(threads)
+        
+        self.signals = ThumbnailSignals(self)
+        self.loaded = self.signals.loaded
+        self.failed = self.signals.failed
+        self.loaded.connect(self._on_done)
+        self.failed.connect(self._on_done)
+    
+    def request(self, source):
+        if source in self.pending:
+            return
+        self.pending.add(source)
+        self.pool.start(ThumbnailTask(self.cache, source, self.signals))
+    
+    def cancel(self):
+        self.pool.clear()
+        self.pending.clear()
+    
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+    
+    def _on_done(self, source, *args):
+        self.pending.discard(source)
@@ -0,0 +1,171 @@
+import json
+from .constants import VERSION_KEYFRAME_INTERVAL
+
+# Поля memes, из которых состоит версия мема (файлы результата хранятся отдельно, в meme_outputs)
+VERSION_FIELDS = ('image_id', 'top_text', 'bottom_text', 'font_size', 'text_color', 'outline_color',
+                  'has_outline', 'has_shadow', 'font', 'filter')
+
+# Версии мема - цепочка: ключевой кадр хранит состояние целиком, остальные версии - только поля,
+# изменившиеся относительно предыдущей. Чтение версии n начинается с ближайшего ключевого кадра
+# не позже n, поэтому читается не больше VERSION_KEYFRAME_INTERVAL строк
+CHAIN_QUERY = '''SELECT version, keyframe, version_data FROM meme_versions
+                 WHERE meme_id = ? AND version <= ? AND version >= (
+                     SELECT MAX(version) FROM meme_versions
+                     WHERE meme_id = ? AND version <= ? AND keyframe)
+                 ORDER BY version'''
+
+class VersionControl:
+    @staticmethod
+    def state(*values):
+        return dict(zip(VERSION_FIELDS, values))
+    
+    @staticmethod
+    def dumps(data):
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    
+    @staticmethod
+    def splice(before, after):
+        # Правка текста как [начало, конец, вставка]: хранится только измененный участок строки
+        start = 0
+        limit = min(len(before), len(after))
+        while start < limit and before[start] == after[start]:
+            start += 1
+        end = 0
+        while end < limit - start and before[-1 - end] == after[-1 - end]:
+            end += 1
+        return [start, len(before) - end, after[start:len(after) - end]]
+    
+    @staticmethod
+    def diff(before, after):
+        # {"set": {поле: значение}, "splice": {поле: правка строки}, "unset": [поля]}, None - изменений нет
+        delta = {}
+        for key, value in after.items():
+            if key in before and before[key] == value:
+                continue
+            if isinstance(value, str) and isinstance(before.get(key), str):
+                edit = VersionControl.splice(before[key], value)
+                if len(edit[2]) + 8 < len(value):
+                    delta.setdefault('splice', {})[key] = edit
+                    continue
+            delta.setdefault('set', {})[key] = value
+        removed = [key for key in before if key not in after]
+        if removed:
+            delta['unset'] = removed
+        return delta or None
+    
+    @staticmethod
+    def apply(state, delta):
+        state.update(delta.get('set', {}))
+        for key, (start, end, text) in delta.get('splice', {}).items():
+            state[key] = state[key][:start] + text + state[key][end:]
+        for key in delta.get('unset', ()):
+            state.pop(key, None)
+        return state
+    
+    @staticmethod
+    def replay(rows):
+        state = None
+        for _, keyframe, data in rows:
+            data = json.loads(data)
+            state = data if keyframe else VersionControl.apply(state, data)
+        return state
+    
+    @staticmethod
+    def latest(execute, meme_id):
+        # (последняя версия, последний ключевой кадр); (None, None) - версий нет
+        return execute('''SELECT MAX(version), MAX(CASE WHEN keyframe THEN version END)
+                          FROM meme_versions WHERE meme_id = ?''', (meme_id,)).fetchone()
+    
+    @staticmethod
+    def load(execute, meme_id, version=None):
+        # execute(query, params) -> курсор: cursor.execute в транзакции или Database._read
+        if version is None:
+            version = VersionControl.latest(execute, meme_id)[0]
+            if version is None:
+                return None
+        rows = execute(CHAIN_QUERY, (meme_id, version, meme_id, version)).fetchall()
+        if not rows or rows[-1][0] != version:
+            return None
+        return VersionControl.replay(rows)
+    
+    @staticmethod
+    def history(execute, meme_id):
+        return execute('''SELECT version, created_at, keyframe, LENGTH(version_data) FROM meme_versions
+                          WHERE meme_id = ? ORDER BY version''', (meme_id,)).fetchall()
+    
+    @staticmethod
+    def append(execute, meme_id, state, interval=VERSION_KEYFRAME_INTERVAL):
+        # Возвращает номер новой версии; если состояние не изменилось, новая версия не создается
+        version, keyframe = VersionControl.latest(execute, meme_id)
+        if version is None:
+            execute('''INSERT INTO meme_versions (meme_id, version, keyframe, version_data)
+                       VALUES (?, 1, 1, ?)''', (meme_id, VersionControl.dumps(state)))
+            return 1
+        
+        delta = VersionControl.diff(VersionControl.load(execute, meme_id, version), state)
+        if delta is None:
+            return version
+        
+        # Ключевой кадр - когда цепочка дошла до интервала или разница не меньше полного состояния
+        data = VersionControl.dumps(delta)
+        full = VersionControl.dumps(state)
+        if keyframe is None or version + 1 - keyframe >= interval or len(data) >= len(full):
+            execute('''INSERT INTO meme_versions (meme_id, version, keyframe, version_data)
+                       VALUES (?, ?, 1, ?)''', (meme_id, version + 1, full))
+        else:
+            execute('''INSERT INTO meme_versions (meme_id, version, keyframe, version_data)
+                       VALUES (?, ?, 0, ?)''', (meme_id, version + 1, data))
+        return version + 1
+    
+    @staticmethod
+    def rollback(execute, meme_id, version):
+        # Откат не удаляет историю: состояние версии записывается как новая последняя версия
+        state = VersionControl.load(execute, meme_id, version)
+        if state is None:
+            raise ValueError(f"У мема {meme_id} нет версии {version}")
+        
+        fields = [key for key in VERSION_FIELDS if key in state]
+        if fields:
+            execute(f"UPDATE memes SET {', '.join(f'{key} = ?' for key in fields)} WHERE id = ?",
+                    [state[key] for key in fields] + [meme_id])
+        return VersionControl.append(execute, meme_id, state)
+    
+    @staticmethod
+    def compact(execute, meme_id, keep=None, interval=VERSION_KEYFRAME_INTERVAL):
+        # Цепочка перекодируется заново: старые полные записи становятся разницами, ключевые кадры
+        # расставляются через interval. keep - сколько последних версий оставить, более старые
+        # удаляются, а первая оставшаяся становится ключевым кадром. Номера версий не меняются
+        rows = execute('''SELECT id, version, keyframe, version_data FROM meme_versions
+                          WHERE meme_id = ? ORDER BY version''', (meme_id,)).fetchall()
+        if not rows:
+            return 0
+        
+        first = 0 if keep is None else max(0, len(rows) - max(1, keep))
+        if first:
+            execute("DELETE FROM meme_versions WHERE meme_id = ? AND version < ?", (meme_id, rows[first][1]))
+        
+        state = None
+        since_keyframe = 0
+        saved = 0
+        for index, (row_id, version, keyframe, data) in enumerate(rows):
+            previous = state
+            state = json.loads(data) if keyframe else VersionControl.apply(dict(state), json.loads(data))
+            if index < first:
+                saved += len(data.encode('utf-8'))
+                continue
+            
+            # Подряд идущие одинаковые версии (старые записи) становятся пустой разницей
+            full = VersionControl.dumps(state)
+            encoded = None
+            if previous is not None and index > first:
+                encoded = VersionControl.dumps(VersionControl.diff(previous, state) or {})
+            if encoded is None or since_keyframe + 1 >= interval or len(encoded) >= len(full):
+                new_keyframe, new_data, since_keyframe = 1, full, 0
+            else:
+                new_keyframe, new_data, since_keyframe = 0, encoded, since_keyframe + 1
+            
+            if (new_keyframe, new_data) != (keyframe, data):
+                execute("UPDATE meme_versions SET keyframe = ?, version_data = ? WHERE id = ?",
+                        (new_keyframe, new_data, row_id))
+            saved += len(data.encode('utf-8')) - len(new_data.encode('utf-8'))
+        return saved
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt6.QtGui import QGuiApplication
+    return QGuiApplication.instance() or QGuiApplication([sys.argv[0]])
+
+
+@pytest.fixture
+def make_image(qapp, tmp_path):
+    # make_image(ширина, высота) - однотонное RGB32; palette=True - Indexed8 с полосами из трех цветов;
+    # name - сохранить в tmp_path и вернуть путь к файлу
+    from PyQt6.QtGui import QImage, QColor
+    
+    def make(width=400, height=300, color=(120, 100, 80), palette=False, name=None):
+        if palette:
+            image = QImage(width, height, QImage.Format.Format_Indexed8)
+            image.setColorTable([QColor(200, 40, 40).rgb(), QColor(30, 160, 90).rgb(), QColor(20, 40, 220).rgb()])
+            for y in range(height):
+                for x in range(width):
+                    image.setPixel(x, y, (x // 50 + y // 50) % 3)
+        else:
+            image = QImage(width, height, QImage.Format.Format_RGB32)
+            image.fill(QColor(*color))
+        
+        if name is None:
+            return image
+        path = str(tmp_path / name)
+        image.save(path)
+        return path
+    
+    return make
@@ -0,0 +1,19 @@
+import os
+
+from src.batch_processor import BatchProcessor
+from src.cli import HeadlessRenderer
+
+
+def test_csv_manifest_with_size_limit(make_image, tmp_path):
+    image = make_image(640, 480, name="source.png")
+    output = str(tmp_path / "meme.jpg")
+    manifest = tmp_path / "jobs.csv"
+    manifest.write_text("image,output,top,max_bytes,encoder_options\n"
+                        f"{image},{output},Верх,20000,\"{{\"\"progressive\"\": true}}\"\n", encoding='utf-8')
+    
+    jobs = BatchProcessor.load_manifest(str(manifest))
+    assert jobs[0]['max_bytes'] == '20000'
+    
+    result = HeadlessRenderer().render_job(jobs[0])
+    assert result['target_met']
+    assert result['bytes'] == os.path.getsize(output) <= 20000
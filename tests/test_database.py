@@ -0,0 +1,51 @@
+import threading
+
+from src.database import Database
+
+
+def test_read_waits_only_for_pending_writes_to_its_tables(tmp_path):
+    db = Database(str(tmp_path / "memes.db"))
+    release = threading.Event()
+    blocked = db.transaction(lambda uow: release.wait(5), ('memes',))
+    
+    # Запись в memes еще не выполнена, но чтение настроек от нее не зависит
+    assert db.get_setting('missing', 'default') == 'default'
+    assert not blocked.done()
+    
+    release.set()
+    assert db.get_statistics() == []
+    assert blocked.done()
+    db.close()
+
+
+def test_read_sees_own_writes(tmp_path):
+    db = Database(str(tmp_path / "memes.db"))
+    db.save_setting('theme', 'dark')
+    assert db.get_setting('theme') == 'dark'
+    
+    db.increment_views(1)
+    image_id = db.save_image("a.png", 10, 10)
+    meme_id = db.save_meme(image_id, "верх", "низ", 48, "#ffffff", "#000000", True, False, "out.png")
+    db.increment_views(meme_id)
+    assert db.get_statistics()[0][4] == 1
+    db.close()
+
+
+def test_history_keeps_every_exported_version(tmp_path):
+    db = Database(str(tmp_path / "memes.db"))
+    image_id = db.save_image("a.png", 10, 10)
+    meme = [image_id, "верх", "низ", 48, "#ffffff", "#000000", True, False, "first.png", "Impact", "Нет"]
+    meme_id = db.save_meme(*meme)
+    
+    # Повторный экспорт того же мема, как в MemeGeneratorPro.record_export
+    meme[1], meme[8] = "новый верх", "second.png"
+    
+    def record(uow):
+        assert uow.update_meme(meme_id, *meme) == 2
+        uow.save_outputs(meme_id, [{'path': "second.png", 'format': 'png', 'width': 10, 'height': 10, 'bytes': 1}])
+    db.transaction(record).result()
+    
+    assert db.get_recent_memes() == ["second.png", "first.png"]
+    assert [row[0] for row in db.get_meme_outputs(meme_id)] == ["first.png", "second.png"]
+    assert db.get_version(meme_id, 1)['top_text'] == "верх"
+    db.close()
@@ -0,0 +1,58 @@
+import sqlite3
+import threading
+
+from src.database_writer import DatabaseWriter
+
+
+class LockedCursor:
+    # Первый BEGIN IMMEDIATE падает, как при занятой базе после busy_timeout
+    def __init__(self, cursor, failures):
+        self.cursor = cursor
+        self.failures = failures
+    
+    def execute(self, query, params=()):
+        if query == "BEGIN IMMEDIATE" and self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return self.cursor.execute(query, params)
+    
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+class LockedConnection:
+    def __init__(self, conn, failures=1):
+        object.__setattr__(self, 'conn', conn)
+        object.__setattr__(self, 'failures', failures)
+    
+    def cursor(self):
+        return LockedCursor(self.conn.cursor(), self.failures)
+    
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+    
+    def __setattr__(self, name, value):
+        setattr(self.conn, name, value)
+
+
+def flush_returns(writer, timeout=5):
+    thread = threading.Thread(target=writer.flush, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+def test_flush_returns_when_begin_fails(tmp_path, monkeypatch):
+    connect = DatabaseWriter.connect
+    monkeypatch.setattr(DatabaseWriter, 'connect', staticmethod(lambda path: LockedConnection(connect(path))))
+    writer = DatabaseWriter(str(tmp_path / "memes.db"))
+    
+    failed = writer.submit(lambda cursor: cursor.execute("CREATE TABLE t (x INTEGER)"))
+    assert flush_returns(writer)
+    assert isinstance(failed.exception(timeout=1), sqlite3.OperationalError)
+    
+    # Поток записи жив и выполняет следующие задачи
+    assert writer.execute(lambda cursor: cursor.execute("CREATE TABLE t (x INTEGER)").rowcount) == -1
+    assert writer.is_alive()
+    assert flush_returns(writer)
+    writer.close()
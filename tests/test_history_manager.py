@@ -0,0 +1,58 @@
+from PyQt6.QtGui import QImage
+
+from src.history_manager import HistoryManager, TileStore
+
+
+def pixels(image):
+    image = image.convertToFormat(QImage.Format.Format_ARGB32)
+    return [image.pixel(x, y) for y in range(0, image.height(), 9) for x in range(0, image.width(), 9)]
+
+
+def test_palette_snapshot_round_trip(make_image):
+    image = make_image(300, 200, palette=True)
+    store = TileStore(tile_size=64)
+    
+    restored = store.restore(store.snapshot(image))
+    
+    assert restored.size() == image.size()
+    assert pixels(restored) == pixels(image)
+
+
+def test_undo_restores_palette_image(make_image):
+    before = make_image(300, 200, palette=True)
+    after = make_image(300, 200, color=(10, 10, 10))
+    
+    history = HistoryManager(merge_ms=0)
+    history.reset({'image': 'before.png'})
+    history.record({'image': 'after.png'}, {'before': before, 'after': after})
+    
+    values, snapshot = history.undo()
+    assert values == {'image': 'before.png'}
+    assert pixels(history.restore_snapshot(snapshot)) == pixels(before)
+    
+    values, snapshot = history.redo()
+    assert values == {'image': 'after.png'}
+    assert pixels(history.restore_snapshot(snapshot)) == pixels(after)
+
+
+def test_snapshot_encoded_later_is_attached(make_image):
+    before = make_image(300, 200, palette=True)
+    
+    history = HistoryManager(merge_ms=0)
+    history.reset({'image': 'before.png'})
+    command = history.record({'image': 'after.png'})
+    assert history.attach(command, 'before', TileStore.encode(before))
+    
+    values, snapshot = history.undo()
+    assert values == {'image': 'before.png'}
+    assert pixels(history.restore_snapshot(snapshot)) == pixels(before)
+
+
+def test_snapshot_is_not_attached_to_released_command(make_image):
+    history = HistoryManager(merge_ms=0)
+    history.reset({'image': 'before.png'})
+    command = history.record({'image': 'after.png'})
+    history.reset({'image': 'other.png'})
+    
+    assert not history.attach(command, 'before', TileStore.encode(make_image(64, 64)))
+    assert history.tiles.bytes == 0
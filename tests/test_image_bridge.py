@@ -0,0 +1,21 @@
+from PIL import Image
+from PyQt6.QtGui import QImage
+
+from src.image_bridge import ImageBridge
+
+
+def test_rgb_image_is_opaque(qapp):
+    # Результат фильтра PIL оставляет в четвертом байте мусор, а не 0xFF
+    img = Image.new("RGB", (64, 48), (120, 100, 80)).convert("RGB", (1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0))
+    qimage = ImageBridge.to_qimage(img).convertToFormat(QImage.Format.Format_ARGB32)
+    
+    assert {qimage.pixelColor(x, y).alpha() for x in range(64) for y in range(48)} == {255}
+    assert qimage.pixelColor(10, 10).getRgb() == (120, 100, 80, 255)
+
+
+def test_round_trip_keeps_pixels(qapp, make_image):
+    image = make_image(64, 48)
+    
+    restored = ImageBridge.to_qimage(ImageBridge.to_pil(image)).convertToFormat(QImage.Format.Format_ARGB32)
+    
+    assert restored.pixelColor(20, 20).getRgb() == (120, 100, 80, 255)
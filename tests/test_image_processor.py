@@ -0,0 +1,27 @@
+from PyQt6.QtCore import QSize
+from PyQt6.QtGui import QImage
+
+from src.filter_pipeline import FilterPipeline
+from src.image_processor import SourceImage
+from src.meme_renderer import MemeRenderer
+from src.render_spec import RenderSpec
+
+
+def test_full_decode_is_not_kept(make_image):
+    source = SourceImage(make_image(640, 480, name="photo.png"))
+    
+    full = source.full()
+    assert full.size() == QSize(640, 480)
+    assert source.preview(QSize(320, 240)).size() == QSize(320, 240)
+    # Источник не держит ссылок на декодированные пиксели
+    assert not [value for value in vars(source).values() if isinstance(value, QImage)]
+
+
+def test_export_render_keeps_no_full_size_layer(make_image):
+    source = SourceImage(make_image(640, 480, name="photo.png"))
+    renderer = MemeRenderer(max_base_layers=0)
+    
+    result = renderer.render(source.full(), RenderSpec(FilterPipeline([('filter', 'Сепия')]), []))
+    
+    assert result.size() == QSize(640, 480)
+    assert not renderer.base_layers
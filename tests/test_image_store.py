@@ -0,0 +1,26 @@
+import os
+
+from PyQt6.QtCore import QSize
+
+from src.database import Database
+from src.image_processor import SourceImage
+from src.image_store import ImageStore
+
+
+def test_renamed_file_opens_from_new_path(make_image, tmp_path):
+    db = Database(str(tmp_path / "memes.db"))
+    store = ImageStore(db)
+    first = make_image(320, 240, name="a.png")
+    
+    image_id, source = store.load(first, SourceImage)
+    assert source.path == first
+    
+    # Та же картинка под другим именем, оригинал удален: запись та же, файл - новый
+    second = str(tmp_path / "b.png")
+    os.rename(first, second)
+    same_id, moved = store.load(second, SourceImage)
+    
+    assert same_id == image_id
+    assert moved.path == second
+    assert moved.preview(QSize(160, 120)).size() == QSize(160, 120)
+    db.close()
@@ -0,0 +1,58 @@
+from PyQt6.QtGui import QImage
+
+from src.cli import HeadlessRenderer
+from src.filter_pipeline import FilterPipeline
+from src.meme_renderer import MemeRenderer
+from src.render_spec import RenderSpec
+
+
+def make_spec(pipeline):
+    style = HeadlessRenderer.parse_style({})
+    return RenderSpec(pipeline, [
+        {'position': 'top', 'text': 'Верхний текст', 'style': style},
+        {'position': 'bottom', 'text': 'Нижний текст', 'style': style},
+    ])
+
+
+def alphas(image):
+    image = image.convertToFormat(QImage.Format.Format_ARGB32)
+    return {image.pixelColor(x, y).alpha() for x in range(0, image.width(), 7) for y in range(0, image.height(), 7)}
+
+
+def test_filtered_rgb_source_with_text_is_opaque(qapp, make_image):
+    source = make_image(320, 240)
+    
+    for operations in ([('filter', 'Сепия')], [('brightness', 1.2)], [('contrast', 1.3)]):
+        spec = make_spec(FilterPipeline(operations))
+        renderer = MemeRenderer()
+        base = renderer.render_base(source, spec.pipeline)
+        result = renderer.render_meme(base, spec)
+        
+        assert alphas(result) == {255}
+        assert result.pixelColor(160, 120) == base.pixelColor(160, 120)
+
+
+def test_render_meme_ignores_garbage_x_byte(qapp):
+    # Формат без альфа-канала: четвертый байт не должен становиться прозрачностью
+    image = QImage(64, 64, QImage.Format.Format_RGBX8888)
+    bits = image.bits()
+    bits.setsize(image.sizeInBytes())
+    bits[:] = bytes([120, 100, 80, 0]) * (image.sizeInBytes() // 4)
+    
+    result = MemeRenderer().render_meme(image, make_spec(FilterPipeline()))
+    
+    assert alphas(result) == {255}
+    assert result.pixelColor(32, 32).getRgb() == (120, 100, 80, 255)
+
+
+def test_caption_on_sepia_image_keeps_sepia_colors(qapp, make_image):
+    source = make_image(400, 300)
+    pipeline = FilterPipeline([('filter', 'Сепия')])
+    spec = RenderSpec(pipeline, [{'position': 'top', 'text': 'Верх', 'style': HeadlessRenderer.parse_style({})}])
+    
+    result = MemeRenderer().render(source, spec).convertToFormat(QImage.Format.Format_ARGB32)
+    sepia = pipeline.apply(source).convertToFormat(QImage.Format.Format_ARGB32).pixelColor(200, 150)
+    
+    assert result.pixelColor(200, 150).getRgb() == sepia.getRgb()
+    assert result.pixelColor(200, 150).getRgb() != (255, 255, 255, 255)
+    assert alphas(result) == {255}
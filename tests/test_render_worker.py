@@ -0,0 +1,42 @@
+import threading
+import time
+
+from src.render_worker import RenderWorker
+
+
+def wait_idle(qapp, worker):
+    deadline = time.monotonic() + 5
+    while worker.is_busy() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+
+
+def test_superseded_job_is_not_run(qapp):
+    worker = RenderWorker()
+    release = threading.Event()
+    worker.pool.start(release.wait)
+    
+    # Пул занят: первая задача уже передана в пул, но не начата, когда ее вытесняет вторая
+    ran, results = [], []
+    worker.submit(lambda: ran.append('old'), results.append)
+    worker.submit(lambda: ran.append('new') or 'new', results.append)
+    release.set()
+    wait_idle(qapp, worker)
+    
+    assert ran == ['new']
+    assert results == ['new']
+
+
+def test_cancelled_job_is_not_run(qapp):
+    worker = RenderWorker(latest_only=False)
+    release = threading.Event()
+    worker.pool.start(release.wait)
+    
+    ran = []
+    worker.submit(lambda: ran.append('job'))
+    worker.cancel()
+    release.set()
+    wait_idle(qapp, worker)
+    worker.wait()
+    
+    assert ran == []